@@ -1,42 +1,74 @@
-import mediapipe as mp
+import argparse
+
 import cv2
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
+
+from capture import open_capture
+from gesture_session import GestureSession
+from result_sink import add_sink_arguments, encode_gestures, sink_from_args
+from sources import add_source_arguments
+from startup import start_in_parallel
 
 model_path = '/gesture_recognizer.task'
 
-BaseOptions = mp.tasks.BaseOptions
-GestureRecognizer = mp.tasks.vision.GestureRecognizer
-GestureRecognizerOptions = mp.tasks.vision.GestureRecognizerOptions
-GestureRecognizerResult = mp.tasks.vision.GestureRecognizerResult
-VisionRunningMode = mp.tasks.vision.RunningMode
-
-# Use OpenCV’s VideoCapture to start capturing from the webcam.
-capture = cv2.VideoCapture(0)
-
-if not capture.isOpened():
-    print("Cannot open camera")
-    exit()
-
-# Create a loop to read the latest frame from the camera using VideoCapture#read()
-while True:
-    ret, frame = capture.read()
-
-    if not ret:
-        print("Can't receive frame (stream end?). Exiting ...")
-        break
-
-    # Convert the frame received from OpenCV to a MediaPipe’s Image object.
-    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
-
-    # Create a gesture recognizer instance with the live stream mode:
-    def print_result(result: GestureRecognizerResult, output_image: mp.Image, timestamp_ms: int):
-        print('gesture recognition result: {}'.format(result))
-
-    options = GestureRecognizerOptions(
-        base_options=BaseOptions(model_asset_path=model_path),
-        running_mode=VisionRunningMode.LIVE_STREAM,
-        result_callback=print_result)
-    with GestureRecognizer.create_from_options(options) as recognizer:
-        # The detector is initialized. Use it here.
-        recognizer.recognize_async(mp_image, frame_timestamp_ms)
+
+def run(capture, sink, session=None):
+    def log_result(result, output_image, timestamp_ms: int):
+        # Log against the capture time of the frame the result belongs to
+        submission = session.lookup(timestamp_ms)
+        if submission is not None and submission.source_time is not None:
+            sink.submit(result, timestamp=submission.source_time)
+        else:
+            sink.submit(result, timestamp=timestamp_ms / 1000)
+
+    # The recognizer is created once for the whole session, not once per frame
+    session = session or GestureSession(model_path, None)
+    # Nothing is delivered before the first recognize(), so the callback can be set late
+    session.result_callback = log_result
+    with session:
+        # Create a loop to read the latest frame grabbed from the camera
+        while True:
+            ret, frame = capture.read()
+
+            if not ret:
+                print("Can't receive frame (stream end?). Exiting ...")
+                break
+
+            # Stamped with the capture time, so LIVE_STREAM sees media time for recordings
+            timestamp = getattr(capture, "last_timestamp", None)
+            if timestamp is None and capture.get(cv2.CAP_PROP_POS_MSEC) > 0:
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            # No --target-fps scheduler here, unlike the Hands scripts: recognize_async
+            # never blocks this loop and LIVE_STREAM drops frames that arrive while
+            # one is still in flight, which the session counts in stats()
+            session.recognize(frame, timestamp)
+
+    capture.release()
+    return session.stats()
+
+
+# The guard keeps a --capture-process child from re-running the script on spawn
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Live gesture recognition",
+        epilog="There is no --target-fps: the recognizer runs asynchronously and drops "
+               "frames it cannot keep up with on its own, see the dropped count it prints.")
+    add_source_arguments(parser)
+    add_sink_arguments(parser)
+    args = parser.parse_args()
+
+    # Start capturing from the webcam (or a recorded source) in the background,
+    # the recognizer model loads while the camera opens
+    capture, session = start_in_parallel(lambda: open_capture(args), lambda: GestureSession(model_path, None))
+
+    try:
+        if not capture.isOpened():
+            print("Cannot open source")
+            exit()
+
+        # Results are logged from a background thread instead of printed in the callback
+        with sink_from_args(args, encoder=encode_gestures) as sink:
+            stats = run(capture, sink, session)
+    finally:
+        # run() closes the session itself, this covers failing before it
+        session.close()
+    print(stats)
@@ -1,51 +1,107 @@
-import mediapipe as mp
+import argparse
+import contextlib
+import functools
+
 import cv2
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+from capture import frame_timestamp, open_capture
+from headless import add_headless_argument, result_emitter
+from preprocess import Preprocessor
+from recording import LandmarkRecorder
+from result_sink import add_sink_arguments, sink_from_args
+from roi import ROITracker
+from scheduler import AdaptiveScheduler, add_scheduler_arguments
+from sources import add_source_arguments
+import startup
+from startup import add_warmup_arguments, start_in_parallel, warmer, with_crop_model
+
+
+# Same model as finger_count, with a stricter detection threshold than the default 0.5
+load_hands = functools.partial(startup.load_hands, min_detection_confidence=0.8, min_tracking_confidence=0.5)
+
+
+def run(cap, headless=False, on_result=None, roi=False, target_fps=None, recorder=None, hands=None, crop_hands=None):
+    import mediapipe as mp
+    mp_drawing = mp.solutions.drawing_utils
+    mp_hands = mp.solutions.hands
+
+    emit = result_emitter(on_result)
+    preprocess = Preprocessor(display=not headless)
+
+    # With roi a second model only sees a crop around the tracked hand
+    crop_model = (crop_hands or load_hands()) if roi else contextlib.nullcontext()
+    with hands or load_hands() as hands, crop_model as crop_hands:
+        detect = ROITracker(hands, crop_hands) if roi else hands.process
+        # Hold or extrapolate landmarks on frames inference has to skip
+        if target_fps:
+            detect = AdaptiveScheduler(detect, target_fps=target_fps)
+
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Mirror into the BGR display buffer and convert that once to RGB,
+            # both buffers are reused across frames
+            image, display = preprocess(frame)
+
+            # Set flag
+            image.flags.writeable = False
 
-cap = cv2.VideoCapture(0)
+            # Detections
+            results = detect(image)
 
-with mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.5) as hands: 
-    while cap.isOpened():
-        ret, frame = cap.read()
+            # Detections
+            emit(results)
+            if recorder is not None:
+                # Frame time from the capture (media time for recordings), not the wall clock
+                recorder.write(results, frame_timestamp(cap))
 
-        # BGR 2 RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Nothing below is needed without a preview window
+            if headless:
+                continue
 
-        # Flip on horizontal
-        image = cv2.flip(image, 1)
+            # Rendering results
+            if results.multi_hand_landmarks:
+                for num, hand in enumerate(results.multi_hand_landmarks):
+                    mp_drawing.draw_landmarks(display, hand, mp_hands.HAND_CONNECTIONS, 
+                                            mp_drawing.DrawingSpec(color=(121, 22, 76), thickness=2, circle_radius=4),
+                                            mp_drawing.DrawingSpec(color=(250, 44, 250), thickness=2, circle_radius=2),
+                                             )
 
-        # Set flag
-        image.flags.writeable = False
 
-        # Detections
-        results = hands.process(image)
+            cv2.imshow('Hand Tracking', display)
 
-        # Set flag to true
-        image.flags.writeable = True
+            if cv2.waitKey(10) & 0xFF == ord('q'):
+                break
 
-        # RGB 2 BGR
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
 
-        # Detections
-        print(results)
 
-        # Rendering results
-        if results.multi_hand_landmarks:
-            for num, hand in enumerate(results.multi_hand_landmarks):
-                mp_drawing.draw_landmarks(image, hand, mp_hands.HAND_CONNECTIONS, 
-                                        mp_drawing.DrawingSpec(color=(121, 22, 76), thickness=2, circle_radius=4),
-                                        mp_drawing.DrawingSpec(color=(250, 44, 250), thickness=2, circle_radius=2),
-                                         )
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hand tracking preview")
+    add_source_arguments(parser)
+    add_headless_argument(parser)
+    add_sink_arguments(parser)
+    parser.add_argument("--roi", action="store_true", help="run the hand model on a tracked crop instead of the full frame")
+    add_scheduler_arguments(parser)
+    parser.add_argument("--record", help="record the landmarks of every frame to this file")
+    add_warmup_arguments(parser)
+    args = parser.parse_args()
 
+    recorder = LandmarkRecorder(args.record) if args.record else None
 
-        cv2.imshow('Hand Tracking', image)
+    # The hand models load while the camera opens, then warm up at its resolution
+    cap, (hands, crop_hands) = start_in_parallel(lambda: open_capture(args), with_crop_model(load_hands, args.roi),
+                                                 warm=warmer(args))
 
-        if cv2.waitKey(10) & 0xFF == ord('q'):
-            break
+    # Results are logged from a background thread instead of printed per frame
+    with sink_from_args(args) as sink:
+        # Frames are grabbed in the background, inference always gets the newest one
+        run(cap, headless=args.headless, on_result=sink, roi=args.roi, target_fps=args.target_fps,
+            recorder=recorder, hands=hands, crop_hands=crop_hands)
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+    if recorder is not None:
+        recorder.close()
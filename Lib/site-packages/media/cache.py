@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""Audio cache
+
+Content-addressed on-disk store for synthesized speech, so repeated
+phrases are played back without another synthesis round trip.
+
+Entries are keyed on (text or SSML, voice name, language, output format)
+and evicted least recently used first once the store exceeds `max_bytes`.
+"""
+
+import collections
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+__all__ = [
+    "AudioCache",
+    "play_wav",
+]
+
+
+class AudioCache:
+    SUFFIX = ".audio"
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.__load()
+
+    def __load(self):
+        # Rebuild the LRU order from the files left by earlier runs
+        found = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            found.append((stat.st_mtime, name[:-len(self.SUFFIX)], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self.__entries[key] = size
+            self.size += size
+        self.__evict()
+
+    @staticmethod
+    def key(text: str, voice_name: str, lang: str, output_format: str = "") -> str:
+        raw = "\x00".join(str(part or "") for part in (text, voice_name, lang, output_format))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key: str):
+        with self.__lock:
+            if key not in self.__entries:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self.__lock:
+                self.size -= self.__entries.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self.__lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+
+        # Write to a temporary name first so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.__path(key))
+
+        with self.__lock:
+            self.size += len(data) - self.__entries.pop(key, 0)
+            self.__entries[key] = len(data)
+            self.__evict()
+
+    def __evict(self):
+        while self.size > self.max_bytes and self.__entries:
+            key, size = self.__entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self.__path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self.__lock:
+            for key in list(self.__entries):
+                try:
+                    os.remove(self.__path(key))
+                except FileNotFoundError:
+                    pass
+            self.__entries.clear()
+            self.size = 0
+
+
+# Command line players tried in order where winsound is missing
+PLAYERS = ("afplay", "paplay", "aplay")
+
+
+def play_wav(data: bytes):
+    """Play RIFF/WAV bytes on the default speaker.
+
+    Uses winsound on Windows, elsewhere the first of PLAYERS found on PATH.
+    Raises RuntimeError when there is none; pass a `player` to Voice then.
+    """
+    if sys.platform == "win32":
+        import winsound
+        winsound.PlaySound(data, winsound.SND_MEMORY)
+        return
+
+    command = next((path for path in map(shutil.which, PLAYERS) if path), None)
+    if command is None:
+        raise RuntimeError(f"play_wav found none of {', '.join(PLAYERS)}; pass a `player` to Voice on this platform.")
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        subprocess.run([command, path], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    finally:
+        os.remove(path)
@@ -9,18 +9,47 @@ See: https://docs.microsoft.com/en-us/azure/cognitive-services/speech-service/in
 
 """
 
+import collections
+import concurrent.futures
 import functools
+import importlib.util
 import re
+import sys
+import threading
 import time
 
-import azure.cognitiveservices.speech as speech_sdk
+from media.cache import AudioCache, play_wav
 
 __all__ = [
+    "AudioCache",
     "SSML",
     "Voice",
 ]
 
 
+def _lazy_import(name):
+    """Import `name` on first attribute access instead of now, None if it is not installed."""
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        spec = None
+    if spec is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# The SDK loads its native library on import; defer that until a Voice is made.
+# It is only required when no `synthesizer` is passed to Voice.
+speech_sdk = _lazy_import("azure.cognitiveservices.speech")
+
+
 class Language:
     ZH_CN = "zh-CN"
     ZH_HK = "zh-HK"
@@ -290,6 +319,22 @@ class SSML:
         return self.ET.tostring(self.root, encoding="unicode", short_empty_elements=False)
 
 
+def _completed(result):
+    # Compared by name, so results of an injected synthesizer need not use the SDK's enum
+    reason = result.reason
+    return getattr(reason, "name", reason) == "SynthesizingAudioCompleted"
+
+
+def _locked(method):
+    # Voice settings and the current synthesizer are shared with the speak_async
+    # worker, so changing them and synthesizing happen under one lock
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._Voice__lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 def voice_process(func):
     @functools.wraps(func)
     def wrapper(cls, *args, **kwargs):
@@ -304,7 +349,7 @@ def voice_process(func):
         else:
             result = cls._Voice__speech_synthesizer.speak_text_async(text).get()
         cls.error = result.cancellation_details
-        return result.reason == speech_sdk.ResultReason.SynthesizingAudioCompleted
+        return _completed(result)
     return wrapper
 
 
@@ -312,44 +357,170 @@ class Voice:
     NAME = VoiceName
     LANG = Language
 
-    def __init__(self, subscription: str, region: str):
-        self.__speech_config = speech_sdk.SpeechConfig(subscription=subscription, region=region)
+    # Speaker synthesizers kept alive, one per voice/language combination
+    POOL_SIZE = 8
+
+    def __init__(self, subscription: str, region: str, cache: AudioCache = None, player=None, synthesizer=None):
+        """`cache` keeps synthesized audio so repeated phrases skip synthesis,
+        cached audio is played with `player` (defaults to `play_wav`).
+
+        `synthesizer(voice_name, lang, *, path=None, memory=False)` builds the
+        synthesizer for one output: a file at `path`, memory, or else the
+        default speaker. It defaults to an Azure SpeechSynthesizer; anything
+        with speak_text_async/speak_ssml_async works, and then the speech SDK
+        is not needed.
+        """
+        if synthesizer is None:
+            if speech_sdk is None:
+                raise ImportError("Voice needs azure-cognitiveservices-speech unless a `synthesizer` is passed")
+            self.__speech_config = speech_sdk.SpeechConfig(subscription=subscription, region=region)
+            self.__name = self.__speech_config.speech_synthesis_voice_name
+            self.__language = self.__speech_config.speech_synthesis_language
+            synthesizer = self.__sdk_synthesizer
+        else:
+            self.__speech_config = None
+            self.__name = None
+            self.__language = None
+        self.__make_synthesizer = synthesizer
+        self.__lock = threading.RLock()
+        self.cache = cache
+        self.player = player or play_wav
+        self.__synthesizers = collections.OrderedDict()
+        self.__executor = None
         self.__set_output()
 
-    def __set_speech_synthesizer(self):
-        self.__speech_synthesizer = speech_sdk.SpeechSynthesizer(
-            speech_config=self.__speech_config,
-            audio_config=self.__audio_config
-        )
+    def __sdk_synthesizer(self, voice_name, lang, *, path=None, memory=False):
+        # The synthesizer copies the voice settings of the config when it is created
+        if voice_name:
+            self.__speech_config.speech_synthesis_voice_name = voice_name
+        if lang:
+            self.__speech_config.speech_synthesis_language = lang
+
+        if path:
+            audio_config = speech_sdk.audio.AudioOutputConfig(filename=path)
+        elif memory:
+            # Without an audio config the audio only comes back in the result
+            audio_config = None
+        else:
+            audio_config = speech_sdk.audio.AudioOutputConfig(use_default_speaker=True)
+        return speech_sdk.SpeechSynthesizer(speech_config=self.__speech_config, audio_config=audio_config)
 
     @property
     def language(self):
-        return self.__speech_config.speech_synthesis_language
+        return self.__language
 
     @language.setter
+    @_locked
     def language(self, lang: str):
-        self.__speech_config.speech_synthesis_language = lang
+        self.__language = lang
 
     @property
     def name(self):
-        return self.__speech_config.speech_synthesis_voice_name
+        return self.__name
 
     @name.setter
+    @_locked
     def name(self, value: str):
-        self.__speech_config.speech_synthesis_voice_name = value
+        self.__name = value
 
-    def __set_output(self, path=None):
-        if not path:
-            self.__audio_config = speech_sdk.audio.AudioOutputConfig(use_default_speaker=True)
-        else:
-            self.__audio_config = speech_sdk.audio.AudioOutputConfig(filename=path)
-        self.__set_speech_synthesizer()
+    @property
+    def output_format(self):
+        if self.__speech_config is None:
+            return ""
+        return self.__speech_config.get_property(speech_sdk.PropertyId.SpeechServiceConnection_SynthOutputFormat)
+
+    def __set_output(self, path=None, memory=False):
+        if path:
+            # A file output is bound to its path, so it is never reused
+            self.__speech_synthesizer = self.__make_synthesizer(self.name, self.language, path=path)
+            return
 
-    @voice_process
+        # The synthesizer copies the voice settings when it is created,
+        # so it is only rebuilt when the voice or language changes.
+        key = ("memory" if memory else "speaker", self.name, self.language)
+        synthesizer = self.__synthesizers.pop(key, None)
+        if synthesizer is None:
+            synthesizer = self.__make_synthesizer(self.name, self.language, memory=memory)
+
+        self.__synthesizers[key] = synthesizer
+        while len(self.__synthesizers) > self.POOL_SIZE:
+            self.__synthesizers.popitem(last=False)
+        self.__speech_synthesizer = synthesizer
+
+    @_locked
     def speak(self, text, *, voice_name=None, lang=None):
-        self.__set_output()
+        if self.cache is not None:
+            audio = self.__cached_audio(text, voice_name=voice_name, lang=lang)
+            if audio is None:
+                return False
+            self.player(audio)
+            return True
+        return self.__speak(text, voice_name=voice_name, lang=lang)
 
     @voice_process
+    def __speak(self, text, *, voice_name=None, lang=None):
+        self.__set_output()
+
+    @_locked
+    def synthesize(self, text, *, voice_name=None, lang=None):
+        """Synthesize into memory and return the audio bytes, or None on failure."""
+        self.name = voice_name or self.name
+        self.language = lang or self.language
+        self.__set_output(memory=True)
+
+        if isinstance(text, SSML):
+            result = self.__speech_synthesizer.speak_ssml_async(text.dump()).get()
+        else:
+            result = self.__speech_synthesizer.speak_text_async(text).get()
+        self.error = result.cancellation_details
+        if _completed(result):
+            return result.audio_data
+
+    def __cached_audio(self, text, *, voice_name=None, lang=None):
+        name = voice_name or self.name
+        language = lang or self.language
+        raw = text.dump() if isinstance(text, SSML) else text
+        key = self.cache.key(raw, name, language, self.output_format)
+
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.synthesize(text, voice_name=name, lang=language)
+            if audio:
+                self.cache.put(key, audio)
+        return audio
+
+    def speak_async(self, text, *, voice_name=None, lang=None):
+        """Speak without blocking.
+
+        Utterances are spoken one at a time in submission order. Returns a
+        `concurrent.futures.Future` holding the result of `speak`. The
+        worker shares the voice settings with speak, save and synthesize;
+        each of those runs start to finish under one lock, so a call on
+        another thread never changes the voice in the middle of one.
+        """
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="voice")
+        return self.__executor.submit(self.speak, text, voice_name=voice_name, lang=lang)
+
+    @_locked
     def save(self, text, *, path=None, voice_name=None, lang=None):
         path = path or f"{int(time.time() * 1e3)}.mp3"
+        if self.cache is not None:
+            audio = self.__cached_audio(text, voice_name=voice_name, lang=lang)
+            if audio is None:
+                return False
+            with open(path, "wb") as f:
+                f.write(audio)
+            return True
+        return self.__save(text, path=path, voice_name=voice_name, lang=lang)
+
+    @voice_process
+    def __save(self, text, *, path=None, voice_name=None, lang=None):
         self.__set_output(path)
+
+    def close(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+        with self.__lock:
+            self.__synthesizers.clear()
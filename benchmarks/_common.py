@@ -0,0 +1,117 @@
+'''
+    Helpers shared by the benchmark scripts.
+
+    Run the benchmarks from the repository root, e.g.
+        python -m benchmarks.gesture_session clip.mp4
+'''
+
+import json
+import platform
+import subprocess
+import time
+
+import numpy as np
+
+from sources import open_source
+
+
+def load_clip(path, limit=None):
+    '''Decode a recorded clip (any file source spec) into a list of BGR frames.'''
+    cap = open_source(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open clip: {path}")
+
+    frames = []
+    while limit is None or len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+
+    cap.release()
+    if not frames:
+        raise SystemExit(f"No frames decoded from: {path}")
+    return frames
+
+
+class Stopwatch:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(name, frames, seconds):
+    fps = frames / seconds if seconds else float("inf")
+    print(f"{name:<24} {frames:>7} frames {seconds:>9.3f} s {fps:>10.1f} fps")
+
+
+class StageTimes:
+    '''Per-stage latency samples with percentile summaries.'''
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def time(self, stage):
+        return _StageTimer(self, stage)
+
+    def summary(self):
+        result = {}
+        for stage, samples in self.samples.items():
+            ms = np.array(samples) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            mean = ms.mean()
+            result[stage] = {
+                "samples": len(ms),
+                "mean_ms": round(float(mean), 4),
+                "p50_ms": round(float(p50), 4),
+                "p95_ms": round(float(p95), 4),
+                "p99_ms": round(float(p99), 4),
+                "fps": round(float(1000 / mean), 1) if mean else None,
+            }
+        return result
+
+    def print(self):
+        print(f"{'stage':<16} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fps':>9}")
+        for stage, s in self.summary().items():
+            print(f"{stage:<16} {s['samples']:>6} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['fps'] or 0:>9.1f}")
+
+
+class _StageTimer:
+    def __init__(self, times, stage):
+        self.times = times
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.times.add(self.stage, time.perf_counter() - self.start)
+
+
+def environment():
+    '''What produced a result file, so runs can be compared between versions.'''
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+    }
+
+
+def write_results(path, name, results, **params):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"benchmark": name, "environment": environment(), "params": params,
+                   "results": results}, f, indent=2)
+    print(f"results written to {path}")
@@ -0,0 +1,53 @@
+'''
+    features.extract cost on a recorded session (or synthetic hands): one
+    call per frame, as a live loop would run it, versus one call for the
+    whole session, as offline training would.
+
+        python -m benchmarks.features sessions/session.hlmk
+        python -m benchmarks.features --synthetic 10000
+'''
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks._common import StageTimes, write_results
+from features import NUM_FEATURES, extract
+from recording import LandmarkReader
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", nargs="?")
+    parser.add_argument("--synthetic", type=int, default=10000, help="random hands when no recording is given")
+    parser.add_argument("--aspect", type=float, default=16 / 9, help="frame width / height")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.recording:
+        with LandmarkReader(args.recording) as reader:
+            seen = np.asarray(reader.hand_counts) > 0
+            # Copied out, the memory maps are closed with the reader
+            hands = np.array(reader.landmarks[seen, 0])
+    else:
+        hands = np.random.default_rng(0).uniform(0, 1, (args.synthetic, 21, 3)).astype(np.float32)
+
+    times = StageTimes()
+    for i in range(len(hands)):
+        with times.time("per frame"):
+            extract(hands[i:i + 1], args.aspect)
+
+    start = time.perf_counter()
+    matrix = extract(hands, args.aspect)
+    times.add("batch/frame", (time.perf_counter() - start) / len(hands))
+
+    print(f"{len(hands)} hands -> {matrix.shape[0]} x {NUM_FEATURES} features")
+    times.print()
+    if args.out:
+        write_results(args.out, "features", times.summary(), recording=args.recording, hands=len(hands),
+                      aspect=args.aspect)
+
+
+if __name__ == "__main__":
+    main()
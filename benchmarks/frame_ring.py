@@ -0,0 +1,119 @@
+'''
+    Moving frames between processes: multiprocessing.Queue (pickles every
+    frame) versus FrameRing (shared memory, overwrite-oldest). The producer
+    writes full frames paced like a camera at --fps (0 for flat out, where
+    the ring shows up as drops rather than backpressure).
+
+        python -m benchmarks.frame_ring --width 1280 --height 720 --frames 500 --fps 60
+'''
+
+import argparse
+import multiprocessing as mproc
+import time
+
+import numpy as np
+
+from benchmarks._common import write_results
+from frame_ring import FrameRing
+
+
+def paced(frames, fps):
+    start = time.perf_counter()
+    for i in range(frames):
+        if fps:
+            delay = start + i / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield i
+
+
+def queue_producer(q, shape, frames, fps):
+    frame = np.zeros(shape, np.uint8)
+    for i in paced(frames, fps):
+        frame[0, 0, 0] = i % 256
+        q.put((time.time(), frame))
+    q.put(None)
+
+
+def ring_producer(ring, frames, fps):
+    frame = np.zeros(ring.shape, np.uint8)
+    for i in paced(frames, fps):
+        frame[0, 0, 0] = i % 256
+        ring.write(frame)
+    ring.close_writer()
+    ring.close()
+
+
+def summarize(received, latencies, seconds, dropped):
+    ms = np.array(latencies) * 1000
+    return {
+        "received": received,
+        "dropped": dropped,
+        "fps": round(received / seconds, 1),
+        "latency_p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(ms, 95)), 3),
+    }
+
+
+def bench_queue(shape, frames, fps):
+    q = mproc.Queue(maxsize=4)
+    p = mproc.Process(target=queue_producer, args=(q, shape, frames, fps))
+    start = time.perf_counter()
+    p.start()
+
+    latencies = []
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        latencies.append(time.time() - item[0])
+    seconds = time.perf_counter() - start
+    p.join()
+    return summarize(len(latencies), latencies, seconds, 0)
+
+
+def bench_ring(shape, frames, slots, fps):
+    ring = FrameRing(shape, slots)
+    p = mproc.Process(target=ring_producer, args=(ring, frames, fps))
+    start = time.perf_counter()
+    p.start()
+
+    latencies = []
+    while True:
+        seq, stamp, view = ring.latest()
+        if seq is None:
+            break
+        latencies.append(time.time() - stamp)
+    seconds = time.perf_counter() - start
+    p.join()
+    dropped = ring.dropped
+    ring.close()
+    return summarize(len(latencies), latencies, seconds, dropped)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    shape = (args.height, args.width, 3)
+    results = {
+        "queue": bench_queue(shape, args.frames, args.fps),
+        "ring": bench_ring(shape, args.frames, args.slots, args.fps),
+    }
+    for name, r in results.items():
+        print(f"{name:<6} {r['received']:>6} received {r['dropped']:>6} dropped {r['fps']:>9.1f} fps "
+              f"latency p50 {r['latency_p50_ms']:.3f} ms p95 {r['latency_p95_ms']:.3f} ms")
+
+    if args.out:
+        write_results(args.out, "frame_ring", results, width=args.width, height=args.height,
+                      frames=args.frames, fps=args.fps)
+
+
+if __name__ == "__main__":
+    main()
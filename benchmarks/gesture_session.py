@@ -0,0 +1,70 @@
+'''
+    Gesture recognizer throughput: recognizer rebuilt per frame (the old
+    Gesture_Recognizer.py loop) versus one persistent GestureSession.
+
+        python -m benchmarks.gesture_session clip.mp4 --model gesture_recognizer.task
+'''
+
+import argparse
+
+import cv2
+import mediapipe as mp
+
+from benchmarks._common import Stopwatch, load_clip, report
+from gesture_session import (BaseOptions, GestureRecognizer,
+                             GestureRecognizerOptions, GestureSession,
+                             VisionRunningMode)
+
+
+def per_frame(frames, model_path):
+    done = []
+
+    def on_result(result, output_image, timestamp_ms):
+        done.append(timestamp_ms)
+
+    for i, frame in enumerate(frames):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        options = GestureRecognizerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=VisionRunningMode.LIVE_STREAM,
+            result_callback=on_result)
+        with GestureRecognizer.create_from_options(options) as recognizer:
+            recognizer.recognize_async(mp_image, i)
+
+    return len(done)
+
+
+def persistent(frames, model_path):
+    done = []
+
+    def on_result(result, output_image, timestamp_ms):
+        done.append(timestamp_ms)
+
+    with GestureSession(model_path, on_result) as session:
+        for frame in frames:
+            session.recognize(frame)
+
+    print(f"  session: {session.stats()}")
+    return len(done)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip")
+    parser.add_argument("--model", default="/gesture_recognizer.task")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    frames = load_clip(args.clip, args.frames)
+
+    for name, run in (("per-frame recognizer", per_frame), ("persistent session", persistent)):
+        with Stopwatch() as sw:
+            completed = run(frames, args.model)
+        report(name, len(frames), sw.elapsed)
+        # LIVE_STREAM drops frames submitted while the graph is busy
+        report("  results delivered", completed, sw.elapsed)
+
+
+if __name__ == "__main__":
+    main()
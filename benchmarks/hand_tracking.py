@@ -0,0 +1,57 @@
+'''
+    Per-frame cost of HandTracker.update (matching, batched finger counting
+    and per-hand debouncing) for 1 to --max-hands hands, against counting
+    each hand on its own with count_fingers_batch. Landmarks are synthetic
+    hands drifting across the frame.
+
+        python -m benchmarks.hand_tracking --frames 2000 --max-hands 4
+'''
+
+import argparse
+
+import numpy as np
+
+from benchmarks._common import StageTimes, write_results
+from hand_tracking import HandTracker
+from landmarks import count_fingers_batch
+
+
+def synthetic_hands(frames, hands, seed=0):
+    '''(frames, hands, 21, 3) landmarks, each hand drifting slowly around its own spot.'''
+    rng = np.random.default_rng(seed)
+    spots = rng.uniform(0.2, 0.8, (1, hands, 1, 3)).astype(np.float32)
+    shape = rng.normal(0, 0.05, (1, hands, 21, 3)).astype(np.float32)
+    drift = np.cumsum(rng.normal(0, 0.002, (frames, hands, 1, 3)), axis=0).astype(np.float32)
+    return spots + shape + drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--max-hands", type=int, default=4)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    times = StageTimes()
+    labels = ("Left", "Right")
+    for n in range(1, args.max_hands + 1):
+        frames = synthetic_hands(args.frames, n)
+        handedness = [labels[i % 2] for i in range(n)]
+
+        tracker = HandTracker()
+        for i, hands in enumerate(frames):
+            with times.time(f"tracker {n} hands"):
+                tracker.update(hands, handedness, i / 30)
+
+        for hands in frames:
+            with times.time(f"per-hand {n} hands"):
+                for hand in hands:
+                    count_fingers_batch(hand[None])
+
+    times.print()
+    if args.out:
+        write_results(args.out, "hand_tracking", times.summary(), frames=args.frames, max_hands=args.max_hands)
+
+
+if __name__ == "__main__":
+    main()
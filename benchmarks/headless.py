@@ -0,0 +1,49 @@
+'''
+    Headless versus preview throughput of Hand_Recognizer.py and
+    finger_count.py on a recorded clip. Preview mode needs a display.
+
+        python -m benchmarks.headless clip.mp4
+'''
+
+import argparse
+
+import Hand_Recognizer
+import finger_count
+from benchmarks._common import Stopwatch, report
+from capture import ThreadedCapture
+from sources import open_source
+
+
+class FrameCounter:
+    def __init__(self, source):
+        self.source = source
+        self.frames = 0
+
+    def read(self):
+        ret, frame = self.source.read()
+        self.frames += ret
+        return ret, frame
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip")
+    args = parser.parse_args(argv)
+
+    scripts = (
+        ("Hand_Recognizer", lambda cap, headless: Hand_Recognizer.run(cap, headless, on_result=None)),
+        ("finger_count", lambda cap, headless: finger_count.play(cap, headless)),
+    )
+    for name, run in scripts:
+        for headless in (False, True):
+            cap = FrameCounter(ThreadedCapture(open_source(args.clip)))
+            with Stopwatch() as sw:
+                run(cap, headless)
+            report(f"{name} {'headless' if headless else 'preview'}", cap.frames, sw.elapsed)
+
+
+if __name__ == "__main__":
+    main()
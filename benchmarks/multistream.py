@@ -0,0 +1,37 @@
+'''
+    Throughput scaling of MultiStreamRunner with the number of worker
+    processes, replaying the same recorded clip on several streams.
+    Streams are pinned to workers, so at most --streams workers are used.
+
+        python -m benchmarks.multistream clip.mp4 --streams 4 --workers 1 2 4 8
+'''
+
+import argparse
+
+from benchmarks._common import Stopwatch, report, write_results
+from multistream import MultiStreamRunner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip")
+    parser.add_argument("--streams", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for workers in args.workers:
+        with MultiStreamRunner([args.clip] * args.streams, workers=workers) as runner:
+            with Stopwatch() as sw:
+                frames = sum(1 for _ in runner.results())
+        report(f"{runner.workers} workers", frames, sw.elapsed)
+        results[runner.workers] = {"frames": frames, "seconds": round(sw.elapsed, 4),
+                            "fps": round(frames / sw.elapsed, 1)}
+
+    if args.out:
+        write_results(args.out, "multistream", results, clip=args.clip, streams=args.streams)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+'''
+    Per-stage latency of the capture -> inference -> post-process -> render
+    loop on a recorded clip:
+
+        capture      read()/decode from the source
+        preprocess   mirror and BGR->RGB (Preprocessor)
+        inference    hands.process, or replay of stored landmarks (--landmarks)
+        count        landmarks_to_array + count_fingers_batch
+        draw         draw_landmarks and putText
+        display      cv2.imshow + cv2.waitKey(1), only with --display
+
+    Reports p50/p95/p99 latency and fps per stage and writes them as JSON.
+
+        python -m benchmarks.pipeline clip.mp4 --out pipeline.json
+        python -m benchmarks.pipeline clip.mp4 --save-landmarks clip_landmarks.npy
+        python -m benchmarks.pipeline clip.mp4 --landmarks clip_landmarks.npy
+
+    Stored landmarks are a (frames, hands, 21, 3) float32 .npy, NaN where a
+    hand was not detected, or a LandmarkRecorder recording.
+'''
+
+import argparse
+
+import cv2
+import numpy as np
+
+from benchmarks._common import StageTimes, write_results
+from landmarks import array_to_landmarks, count_fingers_batch, landmarks_to_array
+from preprocess import Preprocessor
+from recording import LandmarkReader
+from sources import open_source
+
+
+def replay(stored):
+    '''Inference stand-in that hands back stored landmarks frame by frame.'''
+    frames = iter(stored)
+    empty = np.empty((0, 21, 3), np.float32)
+
+    def process(rgb):
+        hands = next(frames, None)
+        if hands is None:
+            return empty
+        return np.asarray(hands)[~np.isnan(hands).any(axis=(1, 2))]
+    return process
+
+
+def load_landmarks(path):
+    '''Stored landmarks and the reader to close when done (None for a .npy).'''
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r"), None
+    reader = LandmarkReader(path)
+    return reader.landmarks, reader
+
+
+def live(max_num_hands):
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(max_num_hands=max_num_hands)
+
+    def process(rgb):
+        res = hands.process(rgb)
+        return res.multi_hand_landmarks or []
+    return process
+
+
+def run(args):
+    import mediapipe as mp
+
+    drawing = mp.solutions.drawing_utils
+    connections = mp.solutions.hands.HAND_CONNECTIONS
+
+    times = StageTimes()
+    source = open_source(args.clip)
+    preprocess = Preprocessor()
+    reader = None
+    if args.landmarks:
+        stored, reader = load_landmarks(args.landmarks)
+        process = replay(stored)
+    else:
+        process = live(args.max_hands)
+    buffer = np.empty((args.max_hands, 21, 3), np.float32)
+    saved = []
+
+    frames = 0
+    while args.frames is None or frames < args.frames:
+        with times.time("capture"):
+            ret, frame = source.read()
+        if not ret:
+            break
+        frames += 1
+
+        with times.time("preprocess"):
+            rgb, display = preprocess(frame)
+
+        rgb.flags.writeable = False
+        with times.time("inference"):
+            detected = process(rgb)
+
+        with times.time("count"):
+            hands = detected if args.landmarks else landmarks_to_array(detected, buffer)
+            counts, states = count_fingers_batch(hands)
+
+        if args.save_landmarks:
+            padded = np.full((args.max_hands, 21, 3), np.nan, np.float32)
+            padded[:len(hands)] = hands
+            saved.append(padded)
+
+        # Stored landmarks have to become messages again before drawing_utils can use them
+        messages = array_to_landmarks(hands) if args.landmarks else detected
+
+        with times.time("draw"):
+            for hand in messages:
+                drawing.draw_landmarks(display, hand, connections)
+            cv2.putText(display, f"Fingers: {counts.tolist()}", (0, 25), cv2.FONT_HERSHEY_SIMPLEX,
+                        1, (255, 255, 255), 2, cv2.LINE_AA, False)
+
+        if args.display:
+            with times.time("display"):
+                cv2.imshow("benchmark", display)
+                cv2.waitKey(1)
+
+    source.release()
+    if reader is not None:
+        reader.close()
+    if args.display:
+        cv2.destroyAllWindows()
+    if args.save_landmarks:
+        # A clip without frames still saves a valid, empty (0, hands, 21, 3) array
+        stored = np.stack(saved) if saved else np.empty((0, args.max_hands, 21, 3), np.float32)
+        np.save(args.save_landmarks, stored)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip", help="video file, image directory or .npy frame dump")
+    parser.add_argument("--landmarks", help="replay stored landmarks instead of running the hand model")
+    parser.add_argument("--save-landmarks", help="store detected landmarks for later --landmarks runs")
+    parser.add_argument("--max-hands", type=int, default=2)
+    parser.add_argument("--frames", type=int)
+    parser.add_argument("--display", action="store_true", help="include cv2.imshow/waitKey (needs a display)")
+    parser.add_argument("--out", help="write the per-stage results as JSON")
+    args = parser.parse_args(argv)
+
+    times = run(args)
+    times.print()
+    if args.out:
+        write_results(args.out, "pipeline", times.summary(), clip=args.clip,
+                      landmarks=args.landmarks, max_hands=args.max_hands, display=args.display)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+'''
+    Per-stage preprocessing cost: the old convert/flip/convert round-trip
+    versus Preprocessor with reused buffers. Uses synthetic frames at the
+    given resolution unless a clip is passed.
+
+        python -m benchmarks.preprocess --width 1920 --height 1080
+'''
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks._common import load_clip
+from preprocess import Preprocessor
+
+
+def round_trip(frames):
+    seconds = {"convert": 0.0, "flip": 0.0, "convert back": 0.0}
+    for frame in frames:
+        t0 = time.perf_counter()
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t1 = time.perf_counter()
+        image = cv2.flip(image, 1)
+        t2 = time.perf_counter()
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        t3 = time.perf_counter()
+        seconds["convert"] += t1 - t0
+        seconds["flip"] += t2 - t1
+        seconds["convert back"] += t3 - t2
+    return {stage: 1000 * s / len(frames) for stage, s in seconds.items()}
+
+
+def preprocessor(frames, display):
+    preprocess = Preprocessor(display=display)
+    for frame in frames:
+        preprocess(frame)
+    return preprocess.timings()
+
+
+def show(name, timings):
+    stages = "  ".join(f"{stage} {ms:.3f}" for stage, ms in timings.items())
+    print(f"{name:<22} total {sum(timings.values()):.3f} ms/frame  ({stages})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip", nargs="?")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if args.clip:
+        frames = [cv2.resize(f, (args.width, args.height)) for f in load_clip(args.clip, args.frames)]
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (args.height, args.width, 3), np.uint8) for _ in range(8)]
+        frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    print(f"{args.width}x{args.height}, {len(frames)} frames")
+    show("round trip", round_trip(frames))
+    show("preprocessor", preprocessor(frames, display=True))
+    show("preprocessor headless", preprocessor(frames, display=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+'''
+    Full-frame hand inference versus ROITracker crops on a recorded clip,
+    optionally upscaled to a given resolution (1080p by default).
+
+        python -m benchmarks.roi clip.mp4 --out roi.json
+'''
+
+import argparse
+
+import cv2
+import mediapipe as mp
+
+from benchmarks._common import StageTimes, load_clip, write_results
+from roi import ROITracker
+
+
+def run(frames, use_roi, max_hands):
+    times = StageTimes()
+    with mp.solutions.hands.Hands(max_num_hands=max_hands) as hands:
+        detect = ROITracker(hands, mp.solutions.hands.Hands(max_num_hands=max_hands),
+                            max_hands=max_hands) if use_roi else hands.process
+        for frame in frames:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with times.time("inference"):
+                detect(rgb)
+        if use_roi:
+            detect.close()
+
+    if use_roi:
+        print(f"  roi: {detect.tracked_frames} tracked, {detect.full_frames} full-frame detections")
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clip")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    frames = [cv2.resize(f, (args.width, args.height)) for f in load_clip(args.clip, args.frames)]
+
+    results = {}
+    for name, use_roi in (("full frame", False), ("roi", True)):
+        print(name)
+        times = run(frames, use_roi, args.max_hands)
+        times.print()
+        results[name] = times.summary()
+
+    if args.out:
+        write_results(args.out, "roi", results, clip=args.clip, width=args.width,
+                      height=args.height, max_hands=args.max_hands)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+    Landmark smoothing on recorded sessions: per-frame filter cost, how
+    often the finger count flickers, and time-to-stable-gesture.
+
+    Time-to-stable is measured per labelled segment (see rescore.py for the
+    <recording>.labels.csv format): the time from the segment start until
+    the debouncer commits the labelled gesture. Without labels only cost and
+    flicker are reported.
+
+        python -m benchmarks.smoothing sessions/*.hlmk --hold 0.5
+'''
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks._common import write_results
+from debounce import GestureDebouncer
+from landmarks import GESTURES, count_fingers_batch, gestures_from_counts
+from recording import LandmarkReader
+from rescore import UNLABELED, load_labels
+from smoothing import FILTERS, make_filter
+
+
+def segments(labels):
+    '''(start, end, gesture) runs of labelled frames.'''
+    edges = np.flatnonzero(np.diff(labels)) + 1
+    starts = np.concatenate([[0], edges])
+    ends = np.concatenate([edges, [len(labels)]])
+    return [(s, e, labels[s]) for s, e in zip(starts, ends) if labels[s] != UNLABELED]
+
+
+def evaluate(reader, labels, name, hold):
+    smoother = make_filter(name) if name != "none" else None
+    debounce = GestureDebouncer(hold=hold)
+
+    timestamps = np.asarray(reader.timestamps)
+    if np.isnan(timestamps).any():
+        timestamps = np.arange(len(reader)) / 30.0
+
+    gestures = np.full(len(reader), UNLABELED, np.uint8)
+    committed = np.full(len(reader), UNLABELED, np.uint8)
+    filter_seconds = 0.0
+    for i in range(len(reader)):
+        hands = reader.hands(i)
+        if not len(hands):
+            continue
+        if smoother is not None:
+            start = time.perf_counter()
+            hands = smoother(hands, timestamps[i])
+            filter_seconds += time.perf_counter() - start
+
+        counts, _ = count_fingers_batch(hands[:1], handedness=reader.handedness[i, :1])
+        gestures[i] = gestures_from_counts(counts)[0]
+        value = debounce.update(int(gestures[i]), timestamps[i])
+        if value is not None:
+            committed[i] = value
+
+    seen = gestures[gestures != UNLABELED]
+    minutes = (timestamps[-1] - timestamps[0]) / 60 if len(timestamps) > 1 else 0
+    result = {
+        "filter_us_per_frame": round(1e6 * filter_seconds / max(1, len(seen)), 2),
+        "flicker_per_minute": round(float(np.count_nonzero(np.diff(seen))) / minutes, 1) if minutes else None,
+    }
+
+    if labels is not None:
+        latencies, missed = [], 0
+        for start, end, gesture in segments(labels):
+            hits = np.flatnonzero(committed[start:end] == gesture)
+            if len(hits):
+                latencies.append(timestamps[start + hits[0]] - timestamps[start])
+            else:
+                missed += 1
+        result["time_to_stable_s"] = round(float(np.mean(latencies)), 3) if latencies else None
+        result["segments_missed"] = missed
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--hold", type=float, default=0.5)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for path in args.recordings:
+        with LandmarkReader(path) as reader:
+            labels_path = path + ".labels.csv"
+            labels = load_labels(labels_path, len(reader)) if os.path.exists(labels_path) else None
+            results[path] = {name: evaluate(reader, labels, name, args.hold) for name in ("none",) + FILTERS}
+
+        print(path)
+        for name, r in results[path].items():
+            print(f"  {name:<9} {r['filter_us_per_frame']:>8.1f} us/frame  flicker {r['flicker_per_minute']}/min  "
+                  f"time to stable {r.get('time_to_stable_s')} s  missed {r.get('segments_missed')}")
+
+    if args.out:
+        write_results(args.out, "smoothing", results, hold=args.hold, gestures=GESTURES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+'''
+    Cold start of the entry points: an import-time profile and
+    time-to-first-result with the camera opened before the hand model
+    (sequential), alongside it (parallel), and alongside it with a model
+    warm-up at the capture's resolution once it is open (warmup). Every run is
+    a fresh interpreter, so the numbers include interpreter start and imports.
+    first_frame is the inference latency of the first live frame, steady_frame
+    the median of the next ones.
+
+        python -m benchmarks.startup --source 0 --repeat 5 --warmup-size 1280x720
+        python -m benchmarks.startup --profile
+'''
+
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks._common import write_results
+from startup import parse_size
+
+SCRIPTS = ("Hand_Recognizer", "finger_count")
+MODES = ("sequential", "parallel", "warmup")
+PROFILED = ("Hand_Recognizer", "finger_count", "Gesture_Recognizer", "media")
+
+
+def import_profile(module, top=10):
+    '''Cumulative import time of `module` and its slowest direct imports, from -X importtime.'''
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode:
+        return {"error": proc.stderr.strip().splitlines()[-1]}
+
+    # Nesting shows as two extra spaces of indent before the module name
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(cumulative) / 1000, depth, name.strip()))
+
+    # Children are printed before their parent, so the module's direct imports
+    # are the depth 1 rows since the previous top-level import
+    total, direct, children = 0.0, [], []
+    for ms, depth, name in rows:
+        if depth == 1:
+            children.append((ms, name))
+        elif depth == 0:
+            if name == module:
+                total, direct = ms, sorted(children, reverse=True)
+            children = []
+    return {"total_ms": round(total, 1),
+            "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for ms, name in direct[:top]]}
+
+
+def child(script, mode, source, warmup_size, steady_frames=10):
+    '''Runs in the fresh interpreter: start up, process frames, print the milestones.'''
+    from startup import StartupTimer, capture_size, start_in_parallel, warm_up
+    timer = StartupTimer()
+
+    from capture import ThreadedCapture
+    from preprocess import Preprocessor
+    from sources import open_source
+
+    module = importlib.import_module(script)
+    timer.mark("imports")
+
+    def open_capture():
+        return ThreadedCapture(open_source(source))
+
+    def warm(hands, cap):
+        warm_up(hands.process, capture_size(cap) if warmup_size == "auto" else parse_size(warmup_size))
+
+    if mode == "parallel":
+        cap, hands = start_in_parallel(open_capture, module.load_hands, timer)
+    elif mode == "warmup":
+        cap, hands = start_in_parallel(open_capture, module.load_hands, timer, warm=warm)
+    else:
+        cap = open_capture()
+        timer.mark("capture")
+        hands = module.load_hands()
+        timer.mark("model")
+
+    preprocess = Preprocessor(display=False)
+    latencies = []
+    for _ in range(1 + steady_frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        rgb, _ = preprocess(frame)
+        start = time.perf_counter()
+        hands.process(rgb)
+        latencies.append(time.perf_counter() - start)
+        if len(latencies) == 1:
+            timer.mark("first_result")
+            # The parent times the process up to this line
+            print("first result", flush=True)
+    if not latencies:
+        raise SystemExit(f"No frame from: {source}")
+
+    timer.marks["first_frame"] = latencies[0]
+    timer.marks["steady_frame"] = statistics.median(latencies[1:] or latencies)
+    print(json.dumps(timer.marks), flush=True)
+
+    hands.close()
+    cap.release()
+
+
+def time_to_first_result(script, mode, source, warmup_size):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.startup", "--child", script, mode, source, warmup_size],
+                            stdout=subprocess.PIPE, text=True)
+    proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    line = proc.stdout.readline()
+    proc.wait()
+    if proc.returncode or not line:
+        raise SystemExit(f"{script} {mode} run failed")
+
+    marks = json.loads(line)
+    marks["process"] = elapsed
+    return marks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="0", help="camera index or recorded source")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", action="store_true", help="only print the import-time profile")
+    parser.add_argument("--warmup-size", default="auto", metavar="WxH",
+                        help="resolution of the warm-up frames (default: auto, the capture's)")
+    parser.add_argument("--child", nargs=4, metavar=("SCRIPT", "MODE", "SOURCE", "SIZE"), help=argparse.SUPPRESS)
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return child(*args.child)
+
+    results = {"imports": {}}
+    for module in PROFILED:
+        profile = results["imports"][module] = import_profile(module)
+        if "error" in profile:
+            print(f"import {module:<20} failed: {profile['error']}")
+            continue
+        print(f"import {module:<20} {profile['total_ms']:>9.1f} ms")
+        for row in profile["slowest"]:
+            print(f"    {row['module']:<30} {row['cumulative_ms']:>9.1f} ms")
+
+    if not args.profile:
+        for script in SCRIPTS:
+            for mode in MODES:
+                runs = [time_to_first_result(script, mode, args.source, args.warmup_size) for _ in range(args.repeat)]
+                summary = {stage: round(statistics.median(r[stage] for r in runs) * 1000, 1) for stage in runs[0]}
+                results[f"{script} {mode}"] = summary
+                print(f"{script + ' ' + mode:<28} first result {summary['process']:>8.1f} ms  "
+                      f"(in process: " + ", ".join(f"{k} {v:.0f}" for k, v in summary.items() if k != "process") + ")")
+
+    if args.out:
+        write_results(args.out, "startup", results, source=args.source, repeat=args.repeat,
+                      warmup_size=args.warmup_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+'''
+    Thumb rules (landmarks.THUMB_RULES) on recorded sessions: accuracy
+    against frame labels, split by the handedness of the scored hand, and
+    the per-frame cost of finger_states for one hand and for a batch.
+
+    Labels use the rescore.py <recording>.labels.csv format; recordings
+    without labels are skipped.
+
+        python -m benchmarks.thumb sessions/left_*.hlmk sessions/right_*.hlmk
+'''
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks._common import StageTimes, write_results
+from landmarks import HANDEDNESS_CODES, THUMB_OFFSET, THUMB_RULES, finger_states
+from recording import LandmarkReader
+from rescore import UNLABELED, load_labels, predict
+
+HANDS = {code: label.lower() for label, code in HANDEDNESS_CODES.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--palm-ratio", type=float, default=0.5)
+    parser.add_argument("--thumb-offset", type=float, default=THUMB_OFFSET)
+    parser.add_argument("--timed-frames", type=int, default=2000, help="frames per rule for the single-hand timing")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # rule -> hand -> [correct, scored]
+    scores = {rule: {} for rule in THUMB_RULES}
+    times = StageTimes()
+    for path in args.recordings:
+        labels_path = path + ".labels.csv"
+        if not os.path.exists(labels_path):
+            print(f"{path}: no labels, skipped")
+            continue
+
+        with LandmarkReader(path) as reader:
+            labels = load_labels(labels_path, len(reader))
+            # Copied out, the memory maps are closed with the reader
+            landmarks = np.array(reader.landmarks)
+            hand_counts = np.array(reader.hand_counts)
+            handedness = np.array(reader.handedness)
+
+        keep = labels != UNLABELED
+        hand = np.array([HANDS.get(code, "unknown") for code in handedness[:, 0]])
+        seen = hand_counts > 0
+        for rule in THUMB_RULES:
+            predicted = predict(landmarks, hand_counts, handedness, args.palm_ratio, args.thumb_offset, rule)
+            for name in np.unique(hand[keep]):
+                rows = keep & (hand == name)
+                correct, scored = scores[rule].setdefault(str(name), [0, 0])
+                scores[rule][str(name)] = [correct + int((predicted[rows] == labels[rows]).sum()), scored + int(rows.sum())]
+
+            first = landmarks[seen, 0]
+            first_handedness = handedness[seen, 0]
+            for i in range(min(args.timed_frames, len(first))):
+                with times.time(f"{rule} 1 hand"):
+                    finger_states(first[i:i + 1], args.palm_ratio, args.thumb_offset, first_handedness[i:i + 1], rule)
+            if len(first):
+                start = time.perf_counter()
+                finger_states(first, args.palm_ratio, args.thumb_offset, first_handedness, rule)
+                times.add(f"{rule} batch/frame", (time.perf_counter() - start) / len(first))
+
+    results = {"accuracy": {}, "latency": times.summary()}
+    print(f"{'rule':<8} {'hand':<8} {'frames':>8} {'accuracy':>9}")
+    for rule, hands in scores.items():
+        for name, (correct, scored) in sorted(hands.items()):
+            accuracy = correct / scored if scored else float("nan")
+            results["accuracy"].setdefault(rule, {})[name] = {"frames": scored, "accuracy": round(accuracy, 4)}
+            print(f"{rule:<8} {name:<8} {scored:>8} {accuracy:>9.4f}")
+    print()
+    times.print()
+
+    if args.out:
+        write_results(args.out, "thumb", results, recordings=args.recordings, palm_ratio=args.palm_ratio,
+                      thumb_offset=args.thumb_offset)
+
+
+if __name__ == "__main__":
+    main()
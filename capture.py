@@ -0,0 +1,132 @@
+'''
+    Background frame grabber.
+
+    ThreadedCapture reads from a cv2.VideoCapture-like source on its own
+    thread so camera decode overlaps with inference. Frames wait in a small
+    bounded buffer:
+
+        "latest"  only the newest frame is kept, older ones are dropped
+        "fifo"    up to `depth` frames are kept, the oldest is dropped when full
+        "block"   up to `depth` frames are kept, the grabber waits when full;
+                  nothing is dropped, meant for replaying files
+
+    By default live sources use "latest" and fast file replays use "block".
+    read() and isOpened() behave like cv2.VideoCapture, so the scripts can
+    swap it in for the camera directly. last_timestamp is the source's
+    timestamp of the frame last returned by read(). An error raised by the
+    source ends the stream; read() re-raises it once the buffered frames
+    are consumed.
+'''
+
+import collections
+import threading
+import time
+
+from sources import capture_policy, open_source
+
+POLICIES = ("latest", "fifo", "block")
+
+
+def frame_timestamp(source):
+    '''Time of the frame `source` returned last: its last_timestamp (media
+    time for recordings), or the monotonic clock for sources without one.'''
+    stamp = getattr(source, "last_timestamp", None)
+    return time.monotonic() if stamp is None else stamp
+
+
+class ThreadedCapture:
+    def __init__(self, source=0, policy=None, depth=4):
+        if isinstance(source, (int, str)):
+            source = open_source(source)
+        self.source = source
+
+        policy = policy or capture_policy(source)
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+
+        self.policy = policy
+        self._frames = collections.deque(maxlen=1 if policy == "latest" else depth)
+        self._cond = threading.Condition()
+        self._running = source.isOpened()
+
+        self.grabbed = 0
+        self.dropped = 0
+        self.last_timestamp = None
+        self._error = None
+
+        self._thread = threading.Thread(target=self._grab, name="capture", daemon=True)
+        if self._running:
+            self._thread.start()
+
+    def _grab(self):
+        try:
+            while self._running:
+                ret, frame = self.source.read()
+                stamp = frame_timestamp(self.source)
+
+                with self._cond:
+                    if not ret:
+                        break
+
+                    if self.policy == "block":
+                        self._cond.wait_for(lambda: len(self._frames) < self._frames.maxlen or not self._running)
+                        if not self._running:
+                            break
+                    elif len(self._frames) == self._frames.maxlen:
+                        self.dropped += 1
+                    self._frames.append((stamp, frame))
+                    self.grabbed += 1
+                    self._cond.notify_all()
+        except Exception as exc:
+            self._error = exc
+        finally:
+            # However the grabber ends, readers must not wait for it
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def isOpened(self):
+        with self._cond:
+            return self._running or bool(self._frames)
+
+    def read(self, timeout=None):
+        '''Block until a frame is available. Returns (False, None) at stream end,
+        raises the source's error if it ended the stream.'''
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frames or not self._running, timeout):
+                return False, None
+            if not self._frames:
+                if self._error is not None:
+                    raise self._error
+                return False, None
+            self.last_timestamp, frame = self._frames.popleft()
+            self._cond.notify_all()
+            return True, frame
+
+    def get(self, prop):
+        return self.source.get(prop)
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._frames.clear()
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.source.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def open_capture(args):
+    '''The capture for the --source/--realtime/--capture-process arguments.'''
+    if args.capture_process:
+        from frame_ring import RingCapture
+        return RingCapture(args.source, realtime=args.realtime)
+    return ThreadedCapture(open_source(args.source, realtime=args.realtime))
@@ -0,0 +1,78 @@
+'''
+    Frame-timestamp driven gesture debouncing.
+
+    GestureDebouncer replaces the wall-clock prev/start_init timer of
+    finger_count.py. Every frame's value (e.g. the finger count) goes into a
+    sliding window of the last `window` seconds. A value is committed once
+    the samples in the window span at least `hold` seconds and that value
+    holds at least `majority` of them. A gap of more than `window` seconds
+    between frames (e.g. the hand left the frame) empties the window, so the
+    first frames after it cannot commit anything on their own. Single-frame
+    flicker therefore no longer restarts the timer, and a value that is
+    already committed is not committed again until a different one wins in
+    between (hysteresis).
+
+    Only the timestamps passed in are used, never the clock, so the same
+    recorded sequence always produces the same commits.
+'''
+
+import collections
+
+
+class GestureDebouncer:
+    def __init__(self, hold=0.5, window=None, majority=0.6):
+        if not 0.5 <= majority <= 1:
+            raise ValueError("majority must be between 0.5 and 1")
+        self.hold = hold
+        self.window = window if window is not None else hold
+        if self.window < hold:
+            raise ValueError("window must be at least hold")
+        self.majority = majority
+
+        self._samples = collections.deque()
+        self._counts = collections.Counter()
+
+        self.committed = None
+        self.committed_at = None
+
+    def reset(self):
+        self._samples.clear()
+        self._counts.clear()
+
+    def update(self, value, timestamp):
+        '''Add one frame. Returns the value if this frame commits it, else None.'''
+        if self._samples and timestamp < self._samples[-1][0]:
+            raise ValueError(f"timestamps must not go backwards ({timestamp} after {self._samples[-1][0]})")
+
+        # Nothing seen for longer than the window: the old samples say nothing about now
+        if self._samples and timestamp - self._samples[-1][0] > self.window:
+            self.reset()
+
+        self._samples.append((timestamp, value))
+        self._counts[value] += 1
+
+        # Keep the last `window` seconds, plus the newest sample at or before
+        # its start so that the samples span the whole window
+        start = timestamp - self.window
+        while len(self._samples) > 1 and self._samples[1][0] <= start:
+            _, old = self._samples.popleft()
+            self._counts[old] -= 1
+
+        if timestamp - self._samples[0][0] < self.hold:
+            return None
+
+        leader, votes = self._counts.most_common(1)[0]
+        if leader == self.committed or votes < self.majority * len(self._samples):
+            return None
+
+        self.committed = leader
+        self.committed_at = timestamp
+        return leader
+
+    def run(self, values, timestamps):
+        '''Debounce a recorded sequence, returns [(timestamp, value), ...] commits.'''
+        commits = []
+        for value, timestamp in zip(values, timestamps):
+            if self.update(value, timestamp) is not None:
+                commits.append((timestamp, value))
+        return commits
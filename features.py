@@ -0,0 +1,85 @@
+'''
+    Scale-invariant geometric features for a batch of hands.
+
+    The raw landmarks are normalized coordinates: x in frame widths, y in
+    frame heights. Features computed from them change with the distance of
+    the hand to the camera and with the aspect ratio. Here x is first
+    rescaled to frame heights (pass the frame's width / height as `aspect`).
+    Everything is then expressed relative to the wrist and in units of
+    palm size (wrist to middle knuckle):
+
+        coordinates    (hands, 21, 3)  wrist-relative, palm-size-normalized
+        joint angles   (hands, 5, 3)   bend at each finger's three joints,
+                                       radians, 0 for a straight finger
+        tip distances  (hands, 10)     between every pair of fingertips,
+                                       in palm sizes
+
+    extract() computes all of them for a (hands, 21, 3) array in one
+    vectorized pass and returns a (hands, NUM_FEATURES) float32 matrix with
+    columns named by FEATURE_NAMES, ready for any downstream classifier.
+'''
+
+import itertools
+
+import numpy as np
+
+from landmarks import FINGER_NAMES, MIDDLE_MCP, NUM_LANDMARKS, WRIST
+
+# Landmarks of each finger from the wrist out: wrist, then four joints up to the tip
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+])
+TIPS = FINGER_CHAINS[:, -1]
+TIP_PAIRS = np.array(list(itertools.combinations(range(len(TIPS)), 2)))
+
+# Palms smaller than this (in frame heights) are treated as this size
+MIN_PALM = 1e-6
+
+FEATURE_NAMES = tuple(
+    [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in "xyz"]
+    + [f"{finger}_angle{j}" for finger in FINGER_NAMES for j in range(3)]
+    + [f"{FINGER_NAMES[a]}_{FINGER_NAMES[b]}_distance" for a, b in TIP_PAIRS]
+)
+NUM_FEATURES = len(FEATURE_NAMES)
+
+
+def normalize(hands, aspect=1.0):
+    '''Wrist-relative landmarks in palm sizes, shape (hands, 21, 3).'''
+    hands = np.array(hands, np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    # x (and z, which MediaPipe scales like x) from frame widths to frame heights
+    hands[..., 0] *= aspect
+    hands[..., 2] *= aspect
+    hands -= hands[:, WRIST:WRIST + 1]
+    palm = np.linalg.norm(hands[:, MIDDLE_MCP], axis=-1)
+    hands /= np.maximum(palm, MIN_PALM)[:, None, None]
+    return hands
+
+
+def joint_angles(normalized):
+    '''Bend at the three joints of every finger, shape (hands, 5, 3), radians.'''
+    chains = normalized[:, FINGER_CHAINS]
+    bones = np.diff(chains, axis=2)
+    bones /= np.maximum(np.linalg.norm(bones, axis=-1, keepdims=True), MIN_PALM)
+    cos = np.einsum("hfjc,hfjc->hfj", bones[:, :, :-1], bones[:, :, 1:])
+    return np.arccos(np.clip(cos, -1, 1))
+
+
+def tip_distances(normalized):
+    '''Distance between every pair of fingertips (TIP_PAIRS order), shape (hands, 10).'''
+    tips = normalized[:, TIPS]
+    return np.linalg.norm(tips[:, TIP_PAIRS[:, 0]] - tips[:, TIP_PAIRS[:, 1]], axis=-1)
+
+
+def extract(hands, aspect=1.0):
+    '''Feature matrix (hands, NUM_FEATURES) for a (hands, 21, 3) landmark array.'''
+    normalized = normalize(hands, aspect)
+    n = len(normalized)
+    return np.concatenate([
+        normalized.reshape(n, NUM_LANDMARKS * 3),
+        joint_angles(normalized).reshape(n, len(FINGER_CHAINS) * 3),
+        tip_distances(normalized),
+    ], axis=1).astype(np.float32, copy=False)
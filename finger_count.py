@@ -9,109 +9,158 @@
         Roclay Rodrigues and Christopher McKay
 '''
 
+import argparse
+import collections
+import functools
 import cv2
-import mediapipe as mp
-import time
 import random
 
-def count_fingers(lst):
-    cnt = 0
-
-    thresh = (lst.landmark[0].y*100 - lst.landmark[9].y*100)/2
-
-    if (lst.landmark[5].y*100 - lst.landmark[8].y*100) > thresh:
-        cnt += 1
-
-    if (lst.landmark[9].y*100 - lst.landmark[12].y*100) > thresh:
-        cnt += 1
-
-    if (lst.landmark[13].y*100 - lst.landmark[16].y*100) > thresh:
-        cnt += 1
-
-    if (lst.landmark[17].y*100 - lst.landmark[20].y*100) > thresh:
-        cnt += 1
-
-    if (lst.landmark[5].x*100 - lst.landmark[4].x*100) > 6:
-        cnt += 1
-
-    return cnt
-
-cap = cv2.VideoCapture(0)
-
-drawing = mp.solutions.drawing_utils
-hands = mp.solutions.hands
-hand_obj = hands.Hands(max_num_hands=1)
-
-# selects random of three
-options = ["paper", "scissors", "rock"]
-bot = random.choice(options)
-
-player = None
-winner = None
-
-start_init = False
-
-prev = -1
-
-while True:
-    end_time = time.time()
-    _, frm = cap.read()
-    frm = cv2.flip(frm, 1)
-
-    res = hand_obj.process(cv2.cvtColor(frm, cv2.COLOR_BGR2RGB))
-
-    if res.multi_hand_landmarks:
-
-        hand_keyPoints = res.multi_hand_landmarks[0]
-
-        cnt = count_fingers(hand_keyPoints)
-
-        if not (prev == cnt):
-            if not (start_init):
-                start_time = time.time()
-                start_init = True
-
-            elif (end_time-start_time) > 1:
-                if (cnt == 2):
-                    player = "scissors"
-
-                elif (cnt == 5):
-                    player = "paper"
-
-                elif (cnt == 0):
-                    player = "rock"
-
-                else:
-                    player = None
-
-                prev = cnt
-                start_init = False
-
-        drawing.draw_landmarks(frm, hand_keyPoints, hands.HAND_CONNECTIONS)
-
-    cv2.putText(frm, f"Player: {player}      Bot: {bot}",(0, 25), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA, False)
-
-    cv2.putText(frm, f"Winner: {winner}",(0, 450), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA, False)
-
-    cv2.imshow("window", frm)
-
-    if cv2.waitKey(1) == 27:
-        cv2.destroyAllWindows()
-        cap.release()
-        break
-
+from capture import frame_timestamp, open_capture
+from headless import add_headless_argument, result_emitter
+from hand_tracking import HandTracker
+from landmarks import (GESTURES, array_to_landmarks, count_fingers_batch, gestures_from_counts,
+                       landmarks_to_array, result_landmarks)
+from preprocess import Preprocessor
+from recording import LandmarkRecorder
+from roi import ROITracker
+from scheduler import AdaptiveScheduler, add_scheduler_arguments
+from smoothing import FILTERS, make_filter
+from sources import add_source_arguments
+from startup import add_warmup_arguments, load_hands, start_in_parallel, warmer, with_crop_model
+
+# Emitted every time a player's gesture is committed, `hand` is the track ID
+RoundResult = collections.namedtuple("RoundResult", "player bot winner hand handedness", defaults=(None, None))
+
+def count_fingers(lst, handedness=None):
+    counts, _ = count_fingers_batch(landmarks_to_array([lst]), handedness=None if handedness is None else [handedness])
+    return int(counts[0])
+
+def decide_winner(player, bot):
     if player:
         if player == "paper" and bot == "rock":
-            winner = "Player"
+            return "Player"
             
         elif player == "rock" and bot == "scissors":
-            winner = "Player"
+            return "Player"
 
         elif player == "scissors" and bot == "paper":
-            winner = "Player"
+            return "Player"
 
         else:
-            winner = "Bot"
+            return "Bot"
 
     else:
-        winner = "Undetermined"
\ No newline at end of file
+        return "Undetermined"
+
+def player_gesture(count):
+    gesture = GESTURES[gestures_from_counts(count)]
+    return None if gesture == "none" else gesture
+
+def play(cap, headless=False, on_result=None, roi=False, target_fps=None, recorder=None, hold=0.5, smooth=None,
+         hand_obj=None, max_hands=2, crop_hands=None):
+    import mediapipe as mp
+    emit = result_emitter(on_result)
+    preprocess = Preprocessor(display=not headless)
+
+    drawing = mp.solutions.drawing_utils
+    hands = mp.solutions.hands
+    hand_obj = hand_obj or load_hands(max_hands)
+
+    # With roi a second model only sees a crop around the tracked hands
+    roi_tracker = ROITracker(hand_obj, crop_hands or load_hands(max_hands), max_hands=max_hands) if roi else None
+    detect = roi_tracker or hand_obj.process
+    # Hold or extrapolate landmarks on frames inference has to skip
+    if target_fps:
+        detect = AdaptiveScheduler(detect, target_fps=target_fps)
+
+    # selects random of three
+    options = ["paper", "scissors", "rock"]
+    bot = random.choice(options)
+
+    # Each hand gets a stable ID, and its own debouncer and smoothing filter:
+    # a count is committed once it holds the majority for `hold` seconds of frames
+    hands_tracker = HandTracker(hold=hold, make_smoother=functools.partial(make_filter, smooth) if smooth else None)
+    # Track ID -> (handedness, player, winner) of the hands in view
+    players = {}
+
+    try:
+        while True:
+            ret, frm = cap.read()
+            if not ret:
+                break
+            # Frame time from the capture (media time for recordings), not the wall clock
+            timestamp = frame_timestamp(cap)
+            rgb, frm = preprocess(frm)
+
+            res = detect(rgb)
+            if recorder is not None:
+                recorder.write(res, timestamp)
+
+            handedness = [h.classification[0].label for h in res.multi_handedness or []]
+            hands_in_frame = hands_tracker.update(result_landmarks(res), handedness, timestamp)
+
+            for hand in hands_in_frame:
+                _, player, winner = players.get(hand.track, (None, None, decide_winner(None, bot)))
+                if hand.committed is not None:
+                    player = player_gesture(hand.committed)
+                    winner = decide_winner(player, bot)
+                    emit(RoundResult(player, bot, winner, hand.track, hand.handedness))
+                players[hand.track] = (hand.handedness, player, winner)
+
+            # Forget hands whose track was dropped
+            active = {t.id for t in hands_tracker.tracks}
+            players = {track: state for track, state in players.items() if track in active}
+
+            # No drawing, HighGUI or waitKey in headless mode
+            if headless:
+                continue
+
+            if hands_in_frame:
+                # Smoothed landmarks are drawn when smoothing is on
+                drawn = array_to_landmarks([h.landmarks for h in hands_in_frame]) if smooth else res.multi_hand_landmarks
+                for hand_keyPoints in drawn:
+                    drawing.draw_landmarks(frm, hand_keyPoints, hands.HAND_CONNECTIONS)
+
+            cv2.putText(frm, f"Bot: {bot}",(0, 25), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA, False)
+
+            for row, (track, (label, player, winner)) in enumerate(sorted(players.items())):
+                cv2.putText(frm, f"Hand {track} ({label}): {player}   Winner: {winner}",(0, 450 - 30 * row), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA, False)
+
+            cv2.imshow("window", frm)
+
+            if cv2.waitKey(1) == 27:
+                break
+    finally:
+        hand_obj.close()
+        if roi_tracker is not None:
+            roi_tracker.close()
+        cap.release()
+        if not headless:
+            cv2.destroyAllWindows()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rock, paper, scissors against the bot")
+    add_source_arguments(parser)
+    add_headless_argument(parser)
+    parser.add_argument("--roi", action="store_true", help="run the hand model on a tracked crop instead of the full frame")
+    add_scheduler_arguments(parser)
+    parser.add_argument("--record", help="record the landmarks of every frame to this file")
+    add_warmup_arguments(parser)
+    parser.add_argument("--hold", type=float, default=0.5,
+                        help="seconds a finger count must hold the majority before it is committed")
+    parser.add_argument("--smooth", choices=FILTERS, help="smooth landmarks before counting fingers")
+    parser.add_argument("--max-hands", type=int, default=2, help="number of players' hands to track")
+    args = parser.parse_args()
+
+    # The hand models load while the camera opens, then warm up at its resolution
+    cap, (hand_obj, crop_hands) = start_in_parallel(
+        lambda: open_capture(args), with_crop_model(functools.partial(load_hands, args.max_hands), args.roi),
+        warm=warmer(args))
+    recorder = LandmarkRecorder(args.record, max_hands=args.max_hands) if args.record else None
+
+    play(cap, headless=args.headless, on_result=print if args.headless else None, roi=args.roi, target_fps=args.target_fps,
+         recorder=recorder, hold=args.hold, smooth=args.smooth, hand_obj=hand_obj, max_hands=args.max_hands,
+         crop_hands=crop_hands)
+
+    if recorder is not None:
+        recorder.close()
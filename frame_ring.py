@@ -0,0 +1,294 @@
+'''
+    Shared-memory frame ring between processes.
+
+    FrameRing is a fixed ring of preallocated frames in one
+    multiprocessing.shared_memory block, plus a small header of sequence
+    numbers. By default the writer always takes the slot after the newest
+    one, so when the reader falls behind the oldest frame is overwritten
+    rather than the writer blocking. A blocking ring instead makes the writer
+    wait for a free slot and hands the reader every frame in order, as
+    ThreadedCapture's "block" policy does for recorded sources. Readers get
+    numpy views straight onto the shared memory; nothing is pickled per frame.
+
+    A view is only good while its slot still holds the same sequence number:
+    check valid(seq) after using it, or copy it out with read(copy=True).
+
+    RingCapture runs a frame source in its own process and exposes the ring
+    through the cv2.VideoCapture read()/isOpened()/release() interface:
+
+        cap = RingCapture("clip.mp4")
+        ret, frame = cap.read()
+
+    A capture process that fails to open its source, or dies, ends the
+    stream: read() returns (False, None) instead of waiting for it forever.
+'''
+
+import multiprocessing as mproc
+import os
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Header layout (int64): newest sequence, closed flag, last sequence read,
+# blocking flag, then one sequence per slot
+_HEAD = 0
+_CLOSED = 1
+_READ = 2
+_BLOCKING = 3
+_SLOTS = 4
+
+_EMPTY = -1
+_WRITING = -2
+
+
+# Seconds between checks of a stop flag or the other process while waiting
+POLL_INTERVAL = 0.1
+# Seconds between checks for a free slot by a blocked writer
+WRITER_POLL_INTERVAL = 0.0005
+
+
+class FrameRing:
+    def __init__(self, shape, slots=4, dtype=np.uint8, blocking=False):
+        if blocking and slots < 2:
+            raise ValueError("a blocking ring needs at least 2 slots")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        self._header_bytes = (_SLOTS + slots) * 8 + slots * 8
+        self._shm = shared_memory.SharedMemory(create=True, size=self._header_bytes + slots * self.frame_bytes)
+        # Only the creating process unlinks, also when the ring is inherited through fork
+        self._owner = os.getpid()
+        self._cond = mproc.Condition()
+        self._map()
+
+        self._header[:] = _EMPTY
+        self._header[_CLOSED] = 0
+        self._header[_BLOCKING] = blocking
+
+    def _map(self):
+        buf = self._shm.buf
+        self._header = np.ndarray(_SLOTS + self.slots, np.int64, buffer=buf)
+        self._stamps = np.ndarray(self.slots, np.float64, buffer=buf, offset=(_SLOTS + self.slots) * 8)
+        self._frames = np.ndarray((self.slots,) + self.shape, self.dtype, buffer=buf, offset=self._header_bytes)
+        self.last_read = _EMPTY
+        self.last_timestamp = None
+        self.dropped = 0
+
+    # Passed to another process, the ring re-attaches to the same shared memory
+    def __getstate__(self):
+        return {"shape": self.shape, "slots": self.slots, "dtype": self.dtype.str,
+                "name": self._shm.name, "cond": self._cond}
+
+    def __setstate__(self, state):
+        self.shape = state["shape"]
+        self.slots = state["slots"]
+        self.dtype = np.dtype(state["dtype"])
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._header_bytes = (_SLOTS + self.slots) * 8 + self.slots * 8
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = None
+        self._cond = state["cond"]
+        self._map()
+
+    @property
+    def head(self):
+        return int(self._header[_HEAD])
+
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    @property
+    def blocking(self):
+        return bool(self._header[_BLOCKING])
+
+    @blocking.setter
+    def blocking(self, value):
+        # Set by the writer before its first frame
+        self._header[_BLOCKING] = bool(value)
+
+    def _free(self, seq):
+        # The reader may still hold a view of the slot it read last
+        return seq - int(self._header[_READ]) < self.slots
+
+    def reserve(self, stop=None):
+        '''Claim the next slot for writing, returns (seq, view).
+
+        Fill the view (e.g. cap.read(view) decodes straight into it) and then
+        commit(seq). A blocking ring waits until the reader has freed the
+        slot; returns (None, None) if `stop` (an Event) is set meanwhile.
+        '''
+        seq = self.head + 1
+        if self.blocking:
+            # Polled instead of waiting on the condition: notifying a waiter that
+            # died blocks forever in multiprocessing.Condition, so a killed
+            # writer would hang the reader
+            while not self._free(seq):
+                if stop is not None and stop.is_set():
+                    return None, None
+                time.sleep(WRITER_POLL_INTERVAL)
+        slot = seq % self.slots
+        self._header[_SLOTS + slot] = _WRITING
+        return seq, self._frames[slot]
+
+    def commit(self, seq, timestamp=None):
+        slot = seq % self.slots
+        with self._cond:
+            self._stamps[slot] = time.time() if timestamp is None else timestamp
+            self._header[_SLOTS + slot] = seq
+            self._header[_HEAD] = seq
+            self._cond.notify_all()
+
+    def write(self, frame, timestamp=None, stop=None):
+        seq, view = self.reserve(stop)
+        if seq is None:
+            return None
+        view[...] = frame
+        self.commit(seq, timestamp)
+        return seq
+
+    def close_writer(self):
+        '''Tell readers no more frames are coming.'''
+        with self._cond:
+            self._header[_CLOSED] = 1
+            self._cond.notify_all()
+
+    def valid(self, seq):
+        return int(self._header[_SLOTS + seq % self.slots]) == seq
+
+    def latest(self, timeout=None):
+        '''Wait for a frame newer than the last one read, returns (seq, timestamp, view).
+
+        That is the newest frame, or on a blocking ring the next one in order.
+        Returns (None, None, None) on timeout or once the writer closed and
+        every frame has been read. Frames skipped since the previous call are
+        counted in `dropped`.
+        '''
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.head > self.last_read or self.closed, timeout):
+                return None, None, None
+            if self.head <= self.last_read:
+                return None, None, None
+            seq = self.last_read + 1 if self.blocking else self.head
+            # Frees the previous slot for a blocked writer
+            self._header[_READ] = seq
+
+        slot = seq % self.slots
+        self.dropped += seq - self.last_read - 1
+        self.last_read = seq
+        return seq, float(self._stamps[slot]), self._frames[slot]
+
+    def read(self, timeout=None, copy=True):
+        '''cv2-style (ret, frame) of the newest frame; copies unless copy=False.
+
+        The frame's timestamp is left in last_timestamp.
+        '''
+        while True:
+            seq, stamp, view = self.latest(timeout)
+            if seq is None:
+                return False, None
+            self.last_timestamp = stamp
+            if not copy:
+                return True, view
+            frame = view.copy()
+            # Overwritten while copying: take the newer frame instead
+            if self.valid(seq):
+                return True, frame
+
+    def close(self):
+        self._header = self._stamps = self._frames = None
+        self._shm.close()
+        if self._owner == os.getpid():
+            self._shm.unlink()
+
+
+def _capture(spec, ring, stop, realtime):
+    from sources import capture_policy, open_source
+
+    source = None
+    try:
+        source = open_source(spec, realtime=realtime)
+        # Same policy as ThreadedCapture: every frame of a fast replay, the newest of a live source
+        ring.blocking = capture_policy(source) == "block"
+        while not stop.is_set():
+            seq, view = ring.reserve(stop)
+            if seq is None:
+                break
+            ret, frame = source.read()
+            if not ret:
+                break
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+            view[...] = frame
+            ring.commit(seq, source.last_timestamp)
+    finally:
+        ring.close_writer()
+        if source is not None:
+            source.release()
+        ring.close()
+
+
+class RingCapture:
+    '''A frame source running in a child process, read through a FrameRing.'''
+
+    def __init__(self, spec, shape=None, slots=4, realtime=False):
+        if shape is None:
+            shape = _probe_shape(spec)
+        self.ring = FrameRing(shape, slots)
+        self._stop = mproc.Event()
+        self._process = mproc.Process(target=_capture, args=(spec, self.ring, self._stop, realtime),
+                                      name="capture", daemon=True)
+        self._process.start()
+
+    @property
+    def dropped(self):
+        return self.ring.dropped
+
+    @property
+    def last_timestamp(self):
+        return self.ring.last_timestamp
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+            ret, frame = self.ring.read(wait)
+            if ret or self.ring.closed:
+                return ret, frame
+            # A capture process that died never closes the ring, take what it left and stop
+            if not self._process.is_alive():
+                return self.ring.read(0)
+            if deadline is not None and time.monotonic() >= deadline:
+                return False, None
+
+    def isOpened(self):
+        return (not self.ring.closed and self._process.is_alive()) or self.ring.head > self.ring.last_read
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.ring.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.ring.shape[0])
+        return 0.0
+
+    def release(self):
+        self._stop.set()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self.ring.close()
+
+
+def _probe_shape(spec):
+    from sources import open_source
+
+    source = open_source(spec)
+    ret, frame = source.read()
+    source.release()
+    if not ret:
+        raise ValueError(f"cannot read a frame from {spec!r}")
+    return frame.shape
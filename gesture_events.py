@@ -0,0 +1,170 @@
+'''
+    asyncio API for frame results and committed gestures.
+
+    GestureEvents runs capture and hand inference in a one-thread executor
+    and publishes to any number of independent subscribers:
+
+        events = GestureEvents(cap, hands.process)
+
+        async def announce():
+            async for event in events.gestures():
+                await asyncio.wrap_future(voice.speak_async(f"Player: {event.gesture}"))
+
+        async def main():
+            await asyncio.gather(events.run(), announce())
+
+    run() waits for its first subscriber (min_subscribers) before it reads
+    a frame, so consumers started alongside it never miss the first events.
+    Each subscription is an async iterator over its own bounded queue.
+    Publishing never waits: when a subscriber falls behind, its oldest
+    pending item is dropped (and counted), so a slow consumer such as speech
+    output cannot stall capture, inference or the other subscribers.
+'''
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+
+import numpy as np
+
+from capture import frame_timestamp
+from debounce import GestureDebouncer
+from landmarks import GESTURES, count_fingers_batch, gestures_from_counts, result_landmarks
+from preprocess import Preprocessor
+
+FrameResult = collections.namedtuple("FrameResult", "timestamp landmarks counts handedness")
+GestureEvent = collections.namedtuple("GestureEvent", "timestamp count gesture")
+
+_CLOSED = object()
+
+
+class Subscription:
+    def __init__(self, events, kind, maxsize):
+        self._events = events
+        self.kind = kind
+        self._queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def _publish(self, item):
+        if self._queue.full():
+            self._queue.get_nowait()
+            if item is not _CLOSED:
+                self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+    def close(self):
+        self._events._subscribers[self.kind].discard(self)
+        self._publish(_CLOSED)
+
+
+class GestureEvents:
+    def __init__(self, cap, detect, hold=0.5):
+        self.cap = cap
+        self.detect = detect
+        self.debounce = GestureDebouncer(hold=hold)
+
+        self._preprocess = Preprocessor(display=False)
+        # Hands is not thread-safe: all capture and inference stays on this one thread
+        self._executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="inference")
+        self._subscribers = {"frames": set(), "gestures": set()}
+        self._subscribed = asyncio.Event()
+
+    def subscribe(self, kind="gestures", maxsize=16):
+        if kind not in self._subscribers:
+            raise ValueError(f"kind must be one of {tuple(self._subscribers)}, got {kind!r}")
+        subscription = Subscription(self, kind, maxsize)
+        self._subscribers[kind].add(subscription)
+        self._subscribed.set()
+        return subscription
+
+    def frames(self, maxsize=2):
+        '''Async iterator of FrameResult for every processed frame.'''
+        return self.subscribe("frames", maxsize)
+
+    def gestures(self, maxsize=16):
+        '''Async iterator of GestureEvent for every committed gesture.'''
+        return self.subscribe("gestures", maxsize)
+
+    def _publish(self, kind, item):
+        for subscription in list(self._subscribers[kind]):
+            subscription._publish(item)
+
+    def _step(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        timestamp = frame_timestamp(self.cap)
+
+        rgb, _ = self._preprocess(frame)
+        rgb.flags.writeable = False
+        res = self.detect(rgb)
+
+        # Copied out, the detector may reuse its buffers on the next frame
+        landmarks = np.array(result_landmarks(res), np.float32)
+        handedness = [h.classification[0].label for h in res.multi_handedness or []]
+        counts, _ = count_fingers_batch(landmarks, handedness=handedness)
+        return FrameResult(timestamp, landmarks, counts, handedness)
+
+    async def run(self, min_subscribers=1):
+        '''Process frames until the capture ends, then close every subscription.
+        No frame is read before `min_subscribers` subscriptions exist.'''
+        loop = asyncio.get_running_loop()
+        try:
+            while sum(map(len, self._subscribers.values())) < min_subscribers:
+                self._subscribed.clear()
+                await self._subscribed.wait()
+
+            while True:
+                result = await loop.run_in_executor(self._executor, self._step)
+                if result is None:
+                    break
+                self._publish("frames", result)
+
+                if len(result.counts):
+                    count = int(result.counts[0])
+                    if self.debounce.update(count, result.timestamp) is not None:
+                        gesture = GESTURES[gestures_from_counts(count)]
+                        self._publish("gestures", GestureEvent(result.timestamp, count, gesture))
+        finally:
+            for kind in self._subscribers:
+                for subscription in list(self._subscribers[kind]):
+                    subscription.close()
+            # Queued behind a read that may still be running (e.g. when run() was
+            # cancelled), so the capture is never released under cap.read()
+            released = self._executor.submit(self.cap.release)
+            self._executor.shutdown(wait=False)
+            await asyncio.shield(asyncio.wrap_future(released))
+
+
+async def _print_gestures(events):
+    async for event in events.gestures():
+        print(f"{event.timestamp:9.3f}  {event.gesture} ({event.count} fingers)")
+
+
+async def _main(args):
+    import mediapipe as mp
+
+    from capture import open_capture
+
+    with mp.solutions.hands.Hands(max_num_hands=1) as hands:
+        events = GestureEvents(open_capture(args), hands.process, hold=args.hold)
+        await asyncio.gather(events.run(), _print_gestures(events))
+
+
+if __name__ == "__main__":
+    from sources import add_source_arguments
+
+    parser = argparse.ArgumentParser(description="Print committed gestures from the asyncio event API")
+    add_source_arguments(parser)
+    parser.add_argument("--hold", type=float, default=0.5)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,183 @@
+'''
+    Long-lived MediaPipe gesture recognizer.
+
+    The recognizer graph and the .task model are loaded once, frames are then
+    fed through recognize() with strictly increasing timestamps until close().
+
+    LIVE_STREAM mode drops frames submitted while an earlier one is still in
+    flight and delivers results in timestamp order, so every submission is
+    tracked until its result arrives (or a later result proves it was dropped).
+    That gives a dropped-frame count and a per-frame end-to-end latency.
+'''
+
+import collections
+import functools
+import threading
+import time
+
+import cv2
+
+# Task API names, resolved on first use so importing this module does not load mediapipe
+_TASK_APIS = {
+    "BaseOptions": "BaseOptions",
+    "GestureRecognizer": "vision.GestureRecognizer",
+    "GestureRecognizerOptions": "vision.GestureRecognizerOptions",
+    "VisionRunningMode": "vision.RunningMode",
+}
+
+
+def __getattr__(name):
+    if name not in _TASK_APIS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import mediapipe as mp
+
+    value = functools.reduce(getattr, _TASK_APIS[name].split("."), mp.tasks)
+    globals()[name] = value
+    return value
+
+# Submissions kept for lookup() after their result has arrived
+RECENT = 256
+
+
+class Submission:
+    '''One frame handed to recognize_async and what became of it.'''
+
+    __slots__ = ("frame_id", "timestamp_ms", "source_time", "submitted_at", "completed_at", "dropped")
+
+    def __init__(self, frame_id, timestamp_ms, source_time, submitted_at):
+        self.frame_id = frame_id
+        self.timestamp_ms = timestamp_ms
+        # Capture time of the frame (media time for recordings)
+        self.source_time = source_time
+        self.submitted_at = submitted_at
+        self.completed_at = None
+        self.dropped = False
+
+    @property
+    def latency(self):
+        '''Seconds from submission to result, None until it arrives.'''
+        if self.completed_at is None:
+            return None
+        return self.completed_at - self.submitted_at
+
+
+class GestureSession:
+    def __init__(self, model_path, result_callback, num_hands=1):
+        import mediapipe as mp
+
+        self.result_callback = result_callback
+        self._image = functools.partial(mp.Image, image_format=mp.ImageFormat.SRGB)
+
+        vision = mp.tasks.vision
+        options = vision.GestureRecognizerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=num_hands,
+            result_callback=self._on_result)
+
+        self._recognizer = vision.GestureRecognizer.create_from_options(options)
+        self._origin = None
+        self._last_timestamp_ms = -1
+
+        # Results arrive on a MediaPipe thread
+        self._lock = threading.Lock()
+        self._pending = collections.OrderedDict()
+        self._recent = collections.OrderedDict()
+        self.latencies = collections.deque(maxlen=4096)
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        now = time.monotonic()
+        with self._lock:
+            # Results come in timestamp order: anything older still pending was dropped
+            while self._pending:
+                ts, submission = next(iter(self._pending.items()))
+                if ts >= timestamp_ms:
+                    break
+                del self._pending[ts]
+                submission.dropped = True
+                self.dropped += 1
+
+            submission = self._pending.pop(timestamp_ms, None)
+            if submission is not None:
+                submission.completed_at = now
+                self.latencies.append(submission.latency)
+            self.completed += 1
+
+        self.result_callback(result, output_image, timestamp_ms)
+
+    def lookup(self, timestamp_ms):
+        '''The Submission a result_callback timestamp belongs to, or None.'''
+        return self._recent.get(timestamp_ms)
+
+    def next_timestamp(self, source_time=None):
+        '''Milliseconds since the first frame, from source_time (seconds, e.g. the
+        capture's last_timestamp or CAP_PROP_POS_MSEC / 1000) or the monotonic clock.'''
+        if source_time is None:
+            source_time = time.monotonic()
+        if self._origin is None:
+            self._origin = source_time
+
+        # LIVE_STREAM rejects timestamps that do not strictly increase
+        timestamp_ms = int(round((source_time - self._origin) * 1000))
+        if timestamp_ms <= self._last_timestamp_ms:
+            timestamp_ms = self._last_timestamp_ms + 1
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def recognize(self, frame, timestamp=None):
+        '''Submit a BGR frame from OpenCV, optionally with its capture time in
+        seconds; results arrive on the callback. Returns the Submission.'''
+        if self._recognizer is None:
+            raise RuntimeError("GestureSession is closed")
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_image = self._image(data=rgb)
+
+        timestamp_ms = self.next_timestamp(timestamp)
+        submission = Submission(self.submitted, timestamp_ms, timestamp, time.monotonic())
+        with self._lock:
+            self._pending[timestamp_ms] = submission
+            self._recent[timestamp_ms] = submission
+            if len(self._recent) > RECENT:
+                self._recent.popitem(last=False)
+
+        self._recognizer.recognize_async(mp_image, timestamp_ms)
+        self.submitted += 1
+        return submission
+
+    def stats(self):
+        '''Counters plus median and p95 end-to-end latency in milliseconds.'''
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2)
+
+        return {"submitted": self.submitted, "completed": self.completed, "dropped": self.dropped,
+                "in_flight": self.in_flight, "latency_p50_ms": percentile(0.5), "latency_p95_ms": percentile(0.95)}
+
+    def close(self):
+        if self._recognizer is not None:
+            self._recognizer.close()
+            self._recognizer = None
+            # Nothing is delivered after close: whatever is still pending was dropped
+            with self._lock:
+                for submission in self._pending.values():
+                    submission.dropped = True
+                self.dropped += len(self._pending)
+                self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,107 @@
+'''
+    Per-hand state across frames.
+
+    Every detected hand is matched to a track of the previous frames by the
+    distance of its palm centre (midpoint of wrist and middle knuckle), with
+    a handedness mismatch counting as extra distance. All hands of a frame
+    are matched with one distance matrix, greedily nearest first, and counted
+    with one count_fingers_batch call, so a second hand adds little per-frame
+    work. Each track keeps its own ID, handedness, debouncer and (optionally)
+    smoothing filter; a track unseen for `max_age` seconds is dropped and a
+    returning hand gets a new ID.
+'''
+
+import collections
+import itertools
+
+import numpy as np
+
+from debounce import GestureDebouncer
+from landmarks import HANDEDNESS_CODES, MIDDLE_MCP, UNKNOWN_HANDEDNESS, WRIST, count_fingers_batch
+
+# One per detected hand and frame, in the order of the detector's result
+HandState = collections.namedtuple("HandState", "track handedness count committed landmarks")
+
+
+class Track:
+    def __init__(self, track_id, handedness, hold, smoother):
+        self.id = track_id
+        self.handedness = handedness
+        self.debounce = GestureDebouncer(hold=hold)
+        self.smoother = smoother
+        self.center = None
+        self.last_seen = None
+
+
+class HandTracker:
+    def __init__(self, hold=0.5, max_distance=0.2, max_age=0.5, handedness_penalty=0.15, make_smoother=None):
+        '''Distances are in normalized frame units. `make_smoother` builds a
+        landmark filter (see smoothing.make_filter) for every new track.'''
+        self.hold = hold
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.handedness_penalty = handedness_penalty
+        self.make_smoother = make_smoother
+
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def _match(self, centers, codes):
+        '''Index into self.tracks for every hand, -1 where a new track starts.'''
+        matches = np.full(len(centers), -1)
+        if not self.tracks or not len(centers):
+            return matches
+
+        previous = np.array([t.center for t in self.tracks])
+        previous_codes = np.array([HANDEDNESS_CODES.get(t.handedness, UNKNOWN_HANDEDNESS) for t in self.tracks])
+        dist = np.linalg.norm(centers[:, None] - previous[None], axis=2)
+        known = (codes[:, None] != UNKNOWN_HANDEDNESS) & (previous_codes[None] != UNKNOWN_HANDEDNESS)
+        dist += self.handedness_penalty * (known & (codes[:, None] != previous_codes[None]))
+
+        taken = np.zeros(len(self.tracks), bool)
+        for flat in np.argsort(dist, axis=None):
+            hand, track = divmod(int(flat), len(self.tracks))
+            if dist[hand, track] > self.max_distance:
+                break
+            if matches[hand] < 0 and not taken[track]:
+                matches[hand] = track
+                taken[track] = True
+        return matches
+
+    def update(self, landmarks, handedness, timestamp):
+        '''Feed one frame: the (hands, 21, 3) landmarks, their handedness labels
+        ("Left"/"Right", may be shorter or empty) and the frame timestamp.
+        Returns a HandState per hand.'''
+        landmarks = np.array(landmarks, np.float32).reshape(-1, 21, 3)
+        labels = list(handedness)[:len(landmarks)]
+        labels += [None] * (len(landmarks) - len(labels))
+        codes = np.array([HANDEDNESS_CODES.get(label, UNKNOWN_HANDEDNESS) for label in labels])
+        centers = (landmarks[:, WRIST, :2] + landmarks[:, MIDDLE_MCP, :2]) / 2
+
+        tracks = []
+        for i, match in enumerate(self._match(centers, codes)):
+            if match < 0:
+                smoother = self.make_smoother() if self.make_smoother else None
+                track = Track(next(self._ids), labels[i], self.hold, smoother)
+            else:
+                track = self.tracks[match]
+                track.handedness = labels[i] or track.handedness
+            track.center = centers[i]
+            track.last_seen = timestamp
+            tracks.append(track)
+
+            if track.smoother is not None:
+                landmarks[i] = track.smoother(landmarks[i:i + 1], timestamp)[0]
+
+        # A track remembers its label through frames the detector gave none
+        counts, _ = count_fingers_batch(landmarks, handedness=[t.handedness for t in tracks])
+
+        states = []
+        for track, count, hand in zip(tracks, counts.tolist(), landmarks):
+            committed = track.debounce.update(count, timestamp)
+            states.append(HandState(track.id, track.handedness, count, committed, hand))
+
+        # Lost tracks stay matchable for max_age seconds
+        self.tracks = tracks + [t for t in self.tracks
+                                if t not in tracks and timestamp - t.last_seen <= self.max_age]
+        return states
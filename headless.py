@@ -0,0 +1,22 @@
+'''
+    Result delivery for headless runs.
+
+    In headless mode the scripts skip drawing, cv2.imshow and cv2.waitKey and
+    only hand their results on. on_result may be a callable or anything with
+    a put() method (queue.Queue, multiprocessing.Queue).
+'''
+
+
+def result_emitter(target):
+    if target is None:
+        return lambda result: None
+    if hasattr(target, "put"):
+        return target.put
+    if callable(target):
+        return target
+    raise TypeError(f"on_result must be callable or have put(), got {type(target).__name__}")
+
+
+def add_headless_argument(parser):
+    parser.add_argument("--headless", action="store_true",
+                        help="no preview window or drawing, results are only emitted")
@@ -0,0 +1,180 @@
+'''
+    Vectorized landmark math.
+
+    Hands are handled as a float32 array of shape (hands, 21, 3) holding the
+    normalized (x, y, z) of every MediaPipe hand landmark, so a whole frame
+    (or a whole recorded session) is scored with one NumPy call.
+'''
+
+import itertools
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+PINKY_MCP = 17
+
+# Base and tip of index, middle, ring and pinky
+FINGER_BASES = np.array([5, 9, 13, 17])
+FINGER_TIPS = np.array([8, 12, 16, 20])
+
+FINGER_NAMES = ("thumb", "index", "middle", "ring", "pinky")
+
+# Compact handedness codes for binary formats
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+UNKNOWN_HANDEDNESS = 255
+
+# Thumb counts as open when its tip is this far (in percent of frame width)
+# past the index knuckle, away from the palm
+THUMB_OFFSET = 6
+
+# "fixed": the thumb side is always the left of the mirrored frame, which is
+#          only right for a right hand with the palm to the camera
+# "palm":  the thumb side follows the palm orientation, i.e. the pinky to
+#          index knuckle vector, with the handedness label as fallback
+THUMB_RULES = ("fixed", "palm")
+
+# Below this fraction of the palm height the knuckle line is too short to
+# give a direction (palm seen edge-on)
+EDGE_ON_RATIO = 0.25
+
+
+def landmarks_to_array(multi_hand_landmarks, out=None):
+    '''Convert MediaPipe NormalizedLandmarkList messages to a (hands, 21, 3) array.
+
+    Pass a preallocated `out` of shape (max_hands, 21, 3) to avoid allocating
+    per frame; a view of its first len(multi_hand_landmarks) rows is returned.
+    '''
+    n = len(multi_hand_landmarks)
+    if out is None:
+        out = np.empty((n, NUM_LANDMARKS, 3), np.float32)
+    elif len(out) < n:
+        raise ValueError(f"out holds {len(out)} hands, got {n}")
+
+    coords = itertools.chain.from_iterable(
+        (lm.x, lm.y, lm.z) for hand in multi_hand_landmarks for lm in hand.landmark)
+    out[:n].reshape(-1)[:] = np.fromiter(coords, np.float32, n * NUM_LANDMARKS * 3)
+    return out[:n]
+
+
+def handedness_codes(handedness, n):
+    '''HANDEDNESS_CODES for n hands from labels, codes or None (all unknown).'''
+    codes = np.full(n, UNKNOWN_HANDEDNESS, np.uint8)
+    if handedness is None:
+        return codes
+    if isinstance(handedness, np.ndarray) and handedness.dtype.kind in "iu":
+        # Already codes, e.g. a LandmarkReader.handedness column
+        codes[:len(handedness[:n])] = handedness[:n]
+        return codes
+    handedness = list(handedness)[:n]
+    for i, h in enumerate(handedness):
+        if h is not None:
+            codes[i] = HANDEDNESS_CODES.get(h, UNKNOWN_HANDEDNESS) if isinstance(h, str) else h
+    return codes
+
+
+def thumb_direction(x, y, handedness=None):
+    '''Unit vector (dx, dy) per hand pointing from the palm to the thumb side.
+
+    Takes the pinky to index knuckle vector, so it turns with the hand and
+    flips between left and right hands and between palm and back of the
+    hand. When the palm is seen edge-on that vector is too short, and the
+    handedness label decides instead: a right hand's thumb points left on
+    the mirrored frame, a left hand's right (unknown counts as right).
+    '''
+    dx = x[:, INDEX_MCP] - x[:, PINKY_MCP]
+    dy = y[:, INDEX_MCP] - y[:, PINKY_MCP]
+    length = np.hypot(dx, dy)
+    palm = np.hypot(x[:, WRIST] - x[:, MIDDLE_MCP], y[:, WRIST] - y[:, MIDDLE_MCP])
+
+    edge_on = length <= EDGE_ON_RATIO * palm
+    left = handedness_codes(handedness, len(x)) == HANDEDNESS_CODES["Left"]
+    length = np.where(edge_on, 1, length)
+    dx = np.where(edge_on, np.where(left, 1, -1), dx / length)
+    dy = np.where(edge_on, 0, dy / length)
+    return dx, dy
+
+
+def finger_states(hands, palm_ratio=0.5, thumb_offset=THUMB_OFFSET, handedness=None, thumb="palm"):
+    '''Per-finger open/closed booleans, shape (hands, 5), thumb first.
+
+    A finger is open when its tip is above its base knuckle by more than
+    palm_ratio of the wrist to middle-knuckle height. The thumb is open when
+    its tip reaches thumb_offset past the index knuckle towards the thumb
+    side, see THUMB_RULES; `handedness` holds a label or code per hand.
+    '''
+    if thumb not in THUMB_RULES:
+        raise ValueError(f"thumb must be one of {THUMB_RULES}, got {thumb!r}")
+    hands = np.asarray(hands, np.float32)
+    x = hands[..., 0] * 100
+    y = hands[..., 1] * 100
+
+    thresh = (y[:, WRIST] - y[:, MIDDLE_MCP]) * palm_ratio
+
+    states = np.empty((len(hands), 5), bool)
+    if thumb == "fixed":
+        states[:, 0] = (x[:, INDEX_MCP] - x[:, THUMB_TIP]) > thumb_offset
+    else:
+        dx, dy = thumb_direction(x, y, handedness)
+        reach = (x[:, THUMB_TIP] - x[:, INDEX_MCP]) * dx + (y[:, THUMB_TIP] - y[:, INDEX_MCP]) * dy
+        states[:, 0] = reach > thumb_offset
+    states[:, 1:] = (y[:, FINGER_BASES] - y[:, FINGER_TIPS]) > thresh[:, None]
+    return states
+
+
+def count_fingers_batch(hands, palm_ratio=0.5, thumb_offset=THUMB_OFFSET, handedness=None, thumb="palm"):
+    '''Returns (counts, states): open fingers per hand and the per-finger booleans.'''
+    states = finger_states(hands, palm_ratio, thumb_offset, handedness, thumb)
+    return states.sum(axis=1), states
+
+
+# Rock, paper, scissors by number of open fingers; other counts are no gesture
+GESTURES = ("none", "rock", "paper", "scissors")
+_GESTURE_BY_COUNT = np.array([1, 0, 3, 0, 0, 2], np.uint8)
+
+
+def gestures_from_counts(counts):
+    '''Gesture codes (indices into GESTURES) for an array of finger counts.'''
+    return _GESTURE_BY_COUNT[counts]
+
+
+class LandmarkResult:
+    '''Looks like a hands.process() result, backed by a (hands, 21, 3) array.'''
+
+    def __init__(self, landmarks, multi_handedness=None):
+        self.landmarks = landmarks
+        self.multi_handedness = multi_handedness
+        self._messages = None
+
+    @property
+    def multi_hand_landmarks(self):
+        if not len(self.landmarks):
+            return None
+        if self._messages is None:
+            self._messages = array_to_landmarks(self.landmarks)
+        return self._messages
+
+
+def result_landmarks(result, out=None):
+    '''The (hands, 21, 3) array of a hands.process() or LandmarkResult result.'''
+    if isinstance(result, LandmarkResult):
+        return result.landmarks
+    return landmarks_to_array(result.multi_hand_landmarks or [], out)
+
+
+def array_to_landmarks(hands):
+    '''Convert a (hands, 21, 3) array back to NormalizedLandmarkList messages,
+    e.g. to draw replayed or post-processed landmarks with drawing_utils.'''
+    from mediapipe.framework.formats import landmark_pb2
+
+    result = []
+    for hand in np.asarray(hands, np.float32):
+        message = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in hand.tolist():
+            message.landmark.add(x=x, y=y, z=z)
+        result.append(message)
+    return result
@@ -0,0 +1,212 @@
+'''
+    Several camera streams through one pool of inference processes.
+
+    MultiStreamRunner owns N capture sources. A feeder thread per stream
+    copies each frame into a free slot of a pool of shared-memory frame
+    buffers and queues only the slot number, so frames are never pickled.
+    Every stream is pinned to one worker process (stream % workers) with a
+    task queue per worker, and the worker keeps a separate
+    mp.solutions.hands.Hands per stream, so each tracker sees exactly one
+    camera's frames, in order. Workers read the frame straight out of shared
+    memory and send back the landmark array. Results are reordered so each
+    stream yields its frames in capture order.
+
+        python multistream.py clip1.mp4 clip2.mp4 --workers 4
+'''
+
+import argparse
+import collections
+import multiprocessing as mproc
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from capture import ThreadedCapture
+from sources import open_source
+
+StreamResult = collections.namedtuple("StreamResult", "stream frame landmarks handedness")
+
+# Default slot size: one 1080p BGR frame
+MAX_FRAME_BYTES = 1920 * 1080 * 3
+
+
+def _worker(slot_names, tasks, results, hands_options):
+    import mediapipe as mp
+
+    from landmarks import landmarks_to_array
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    # One tracker per stream: video-mode tracking state must not cross cameras
+    trackers = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            slot, stream, frame, shape = task
+            if stream not in trackers:
+                trackers[stream] = mp.solutions.hands.Hands(**hands_options)
+
+            bgr = np.ndarray(shape, np.uint8, buffer=slots[slot].buf)
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            res = trackers[stream].process(rgb)
+
+            landmarks = landmarks_to_array(res.multi_hand_landmarks or [])
+            handedness = [h.classification[0].label for h in res.multi_handedness or []]
+            results.put((slot, stream, frame, landmarks, handedness))
+    finally:
+        for hands in trackers.values():
+            hands.close()
+        for shm in slots:
+            shm.close()
+
+
+class MultiStreamRunner:
+    def __init__(self, sources, workers=None, slots=None, max_frame_bytes=MAX_FRAME_BYTES,
+                 realtime=False, **hands_options):
+        self.caps = [ThreadedCapture(open_source(s, realtime=realtime) if isinstance(s, (int, str)) else s)
+                     for s in sources]
+        # Streams are pinned to workers, more workers than streams would idle
+        self.workers = min(workers or os.cpu_count() or 1, len(self.caps))
+        self.max_frame_bytes = max_frame_bytes
+        self.hands_options = hands_options
+
+        # Two slots per worker keep every worker busy while the next frame is copied in
+        self._slots = [shared_memory.SharedMemory(create=True, size=max_frame_bytes)
+                       for _ in range(slots or 2 * self.workers)]
+        self._free = queue.Queue()
+        for i in range(len(self._slots)):
+            self._free.put(i)
+
+        self._tasks = [mproc.Queue() for _ in range(self.workers)]
+        self._results = mproc.Queue()
+        self._processes = []
+        self._feeders = []
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._error = None
+
+    def _feed(self, stream):
+        cap = self.caps[stream]
+        frame_no = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if frame.nbytes > self.max_frame_bytes:
+                    raise ValueError(f"stream {stream}: {frame.nbytes} byte frame exceeds the "
+                                     f"{self.max_frame_bytes} byte slots")
+
+                slot = self._free.get()
+                view = np.ndarray(frame.shape, np.uint8, buffer=self._slots[slot].buf)
+                view[...] = frame
+                self._tasks[stream % self.workers].put((slot, stream, frame_no, frame.shape))
+                frame_no += 1
+        except Exception as exc:
+            self._error = exc
+        finally:
+            with self._lock:
+                self._totals[stream] = frame_no
+
+    def start(self):
+        names = [shm.name for shm in self._slots]
+        for tasks in self._tasks:
+            p = mproc.Process(target=_worker, args=(names, tasks, self._results, self.hands_options),
+                              daemon=True)
+            p.start()
+            self._processes.append(p)
+
+        for stream in range(len(self.caps)):
+            t = threading.Thread(target=self._feed, args=(stream,), name=f"feed-{stream}", daemon=True)
+            t.start()
+            self._feeders.append(t)
+
+    def results(self):
+        '''Yield StreamResult tuples, in frame order within each stream.'''
+        if not self._processes:
+            self.start()
+
+        received = collections.Counter()
+        next_frame = [0] * len(self.caps)
+        waiting = [{} for _ in self.caps]
+
+        while True:
+            with self._lock:
+                done = (len(self._totals) == len(self.caps)
+                        and all(received[s] == n for s, n in self._totals.items()))
+            if done:
+                break
+            if self._error is not None:
+                raise self._error
+            # Streams are pinned, a dead worker's frames would never come back
+            dead = [i for i, p in enumerate(self._processes) if not p.is_alive()]
+            if dead:
+                raise RuntimeError(f"inference worker {dead[0]} exited (code {self._processes[dead[0]].exitcode})")
+
+            try:
+                slot, stream, frame, landmarks, handedness = self._results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            self._free.put(slot)
+            received[stream] += 1
+            waiting[stream][frame] = StreamResult(stream, frame, landmarks, handedness)
+
+            while next_frame[stream] in waiting[stream]:
+                yield waiting[stream].pop(next_frame[stream])
+                next_frame[stream] += 1
+
+    def close(self):
+        for cap in self.caps:
+            cap.release()
+        for tasks in self._tasks[:len(self._processes)]:
+            tasks.put(None)
+        for p in self._processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hand landmarks for several streams on a process pool")
+    parser.add_argument("sources", nargs="+", help="camera indices, video files, image directories or .npy dumps")
+    parser.add_argument("--workers", type=int, help="inference processes (default: one per core)")
+    parser.add_argument("--max-hands", type=int, default=1)
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay recorded sources at their native fps instead of as fast as possible")
+    args = parser.parse_args(argv)
+
+    from landmarks import count_fingers_batch
+
+    frames = collections.Counter()
+    start = time.perf_counter()
+    with MultiStreamRunner(args.sources, workers=args.workers, realtime=args.realtime,
+                           max_num_hands=args.max_hands) as runner:
+        for result in runner.results():
+            frames[result.stream] += 1
+            if len(result.landmarks):
+                counts, _ = count_fingers_batch(result.landmarks, handedness=result.handedness)
+                print(f"stream {result.stream} frame {result.frame}: {counts.tolist()}")
+    elapsed = time.perf_counter() - start
+
+    total = sum(frames.values())
+    print(f"{total} frames from {len(args.sources)} streams in {elapsed:.2f} s ({total / elapsed:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
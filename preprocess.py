@@ -0,0 +1,65 @@
+'''
+    Frame preprocessing with preallocated buffers.
+
+    The old Hand_Recognizer.py loop converted BGR->RGB, flipped, then
+    converted RGB->BGR again for drawing: three full-frame copies per frame.
+    Preprocessor mirrors the camera frame once into a BGR display buffer and
+    converts that once into the RGB inference buffer, writing into the same
+    two arrays every frame. Converting in place is slower than converting
+    between two buffers, so the mirror buffer is kept even without a display.
+'''
+
+import time
+
+import cv2
+import numpy as np
+
+STAGES = ("flip", "convert")
+
+
+class Preprocessor:
+    def __init__(self, mirror=True, display=True):
+        self.mirror = mirror
+        self.display = display
+
+        self._rgb = None
+        self._bgr = None
+
+        self.frames = 0
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+
+    def _buffers(self, frame):
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+            self._bgr = np.empty_like(frame)
+        # hands.process() wants the inference view read-only, we write it again here
+        self._rgb.flags.writeable = True
+        return self._rgb, self._bgr
+
+    def __call__(self, frame):
+        '''Returns (rgb, bgr): the RGB inference view and the BGR display view (or None).
+
+        Both arrays are reused on the next call, copy them to keep them longer.
+        '''
+        rgb, bgr = self._buffers(frame)
+
+        t0 = time.perf_counter()
+        if self.mirror:
+            src = cv2.flip(frame, 1, dst=bgr)
+        else:
+            src = frame
+            if self.display:
+                bgr[...] = frame
+        t1 = time.perf_counter()
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=rgb)
+        t2 = time.perf_counter()
+
+        self.frames += 1
+        self.seconds["flip"] += t1 - t0
+        self.seconds["convert"] += t2 - t1
+        return rgb, bgr if self.display else None
+
+    def timings(self):
+        '''Mean milliseconds per frame for each stage.'''
+        frames = self.frames or 1
+        return {stage: 1000 * seconds / frames for stage, seconds in self.seconds.items()}
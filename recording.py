@@ -0,0 +1,170 @@
+'''
+    Compact binary recordings of hand landmark sessions.
+
+    A recording is one file:
+
+        header   64 bytes, see HEADER
+        data     float32 (frames, max_hands, 21, 3) landmarks, NaN where a
+                 hand slot is empty, streamed to disk frame by frame
+        index    float64 timestamps[frames], uint8 hand_counts[frames],
+                 uint8 handedness[frames, max_hands] (0 left, 1 right,
+                 255 unknown), float32 scores[frames, max_hands];
+                 written on close
+
+    LandmarkReader memory-maps the data and index, so hours of sessions can
+    be re-scored offline with random access and without loading them into
+    memory. A recording that was never closed still opens: the frame count
+    is taken from the file size and the index is left empty (NaN timestamps).
+'''
+
+import array
+import mmap
+import struct
+
+import numpy as np
+
+from landmarks import HANDEDNESS_CODES, NUM_LANDMARKS, UNKNOWN_HANDEDNESS, result_landmarks
+
+MAGIC = b"HLMK"
+VERSION = 1
+
+# magic, version, max_hands, landmarks, dims, frames, data offset, index offset
+HEADER = struct.Struct("<4sHHHHQQQ")
+HEADER_SIZE = 64
+
+
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=2):
+        self.path = path
+        self.max_hands = max_hands
+        self.frames = 0
+
+        self._file = open(path, "wb")
+        self._file.write(self._header(0, 0))
+
+        self._frame = np.empty((max_hands, NUM_LANDMARKS, 3), np.float32)
+        self._timestamps = array.array("d")
+        self._counts = array.array("B")
+        self._handedness = array.array("B")
+        self._scores = array.array("f")
+
+    def _header(self, frames, index_offset):
+        header = HEADER.pack(MAGIC, VERSION, self.max_hands, NUM_LANDMARKS, 3, frames, HEADER_SIZE, index_offset)
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def write_array(self, landmarks, timestamp, handedness=(), scores=()):
+        '''Append one frame: a (hands, 21, 3) array, extra hands beyond max_hands are dropped.'''
+        count = min(len(landmarks), self.max_hands)
+        self._frame.fill(np.nan)
+        self._frame[:count] = landmarks[:count]
+        self._file.write(self._frame.tobytes())
+
+        self._timestamps.append(timestamp)
+        self._counts.append(count)
+        for i in range(self.max_hands):
+            label = handedness[i] if i < len(handedness) and i < count else None
+            self._handedness.append(HANDEDNESS_CODES.get(label, UNKNOWN_HANDEDNESS))
+            self._scores.append(scores[i] if i < len(scores) and i < count else np.nan)
+        self.frames += 1
+
+    def write(self, result, timestamp):
+        '''Append the hands of a hands.process() (or LandmarkResult) result.'''
+        handedness = [h.classification[0] for h in result.multi_handedness or []]
+        self.write_array(result_landmarks(result), timestamp,
+                         [h.label for h in handedness], [h.score for h in handedness])
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for column in (self._timestamps, self._counts, self._handedness, self._scores):
+            column.tofile(self._file)
+        self._file.seek(0)
+        self._file.write(self._header(self.frames, index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+            file_size = f.seek(0, 2)
+
+        magic, version, max_hands, landmarks, dims, frames, data_offset, index_offset = HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported recording version {version}")
+
+        self.max_hands = max_hands
+        frame_shape = (max_hands, landmarks, dims)
+        frame_bytes = int(np.prod(frame_shape)) * 4
+
+        self.complete = index_offset != 0
+        if not self.complete:
+            frames = (file_size - data_offset) // frame_bytes
+        self.frames = frames
+
+        # One read-only map of the whole file, the columns are views into it
+        self._mmap = None
+        if frames:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.landmarks = self._view(np.float32, data_offset, (frames,) + frame_shape)
+        else:
+            self.landmarks = np.empty((0,) + frame_shape, np.float32)
+
+        if self.complete and frames:
+            offset = index_offset
+            self.timestamps = self._view(np.float64, offset, (frames,))
+            offset += frames * 8
+            self.hand_counts = self._view(np.uint8, offset, (frames,))
+            offset += frames
+            self.handedness = self._view(np.uint8, offset, (frames, max_hands))
+            offset += frames * max_hands
+            self.scores = self._view(np.float32, offset, (frames, max_hands))
+        else:
+            self.timestamps = np.full(frames, np.nan)
+            self.hand_counts = (~np.isnan(self.landmarks[..., 0, 0])).sum(axis=1).astype(np.uint8)
+            self.handedness = np.full((frames, max_hands), UNKNOWN_HANDEDNESS, np.uint8)
+            self.scores = np.full((frames, max_hands), np.nan, np.float32)
+
+    def _view(self, dtype, offset, shape):
+        return np.frombuffer(self._mmap, dtype, int(np.prod(shape)), offset).reshape(shape)
+
+    def __len__(self):
+        return self.frames
+
+    def hands(self, frame):
+        '''The (hands, 21, 3) landmarks actually detected in one frame.'''
+        return np.asarray(self.landmarks[frame, :self.hand_counts[frame]])
+
+    def chunks(self, size=65536):
+        '''Yield (start, landmarks, hand_counts) blocks of at most `size` frames.'''
+        for start in range(0, self.frames, size):
+            stop = min(start + size, self.frames)
+            yield start, np.asarray(self.landmarks[start:stop]), np.asarray(self.hand_counts[start:stop])
+
+    def close(self):
+        for name in ("landmarks", "timestamps", "hand_counts", "handedness", "scores"):
+            setattr(self, name, None)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Arrays handed out still view the file, it is unmapped when the last one goes
+                pass
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+'''
+    Offline re-scoring of recorded landmark sessions.
+
+    Runs vectorized finger counting and the rock/paper/scissors mapping over
+    every frame of many LandmarkRecorder recordings, for a grid of
+    count_fingers thresholds and thumb rules, and reports a confusion matrix
+    per setting against frame labels. Files are spread over a process pool and
+    each file is streamed in fixed-size chunks, so memory stays bounded
+    however long the sessions are.
+
+    Labels live next to each recording in <recording>.labels.csv, one range
+    per line:
+
+        start_frame,end_frame,label      (end exclusive, label in GESTURES)
+
+    Frames outside every range are not scored.
+
+        python rescore.py sessions/*.hlmk --palm-ratio 0.4 0.5 0.6 --thumb-offset 4 6 8 --thumb fixed palm
+'''
+
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+
+import numpy as np
+
+from landmarks import GESTURES, THUMB_RULES, count_fingers_batch, gestures_from_counts
+from recording import LandmarkReader
+
+UNLABELED = 255
+NO_GESTURE = GESTURES.index("none")
+
+
+def load_labels(path, frames):
+    '''Per-frame gesture codes from a range file, UNLABELED where not covered.'''
+    labels = np.full(frames, UNLABELED, np.uint8)
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            start, end, label = int(row[0]), int(row[1]), row[2].strip()
+            labels[start:end] = GESTURES.index(label)
+    return labels
+
+
+def predict(landmarks, hand_counts, handedness, palm_ratio, thumb_offset, thumb="palm"):
+    '''Gesture code per frame from the first hand, no gesture where none was seen.'''
+    predicted = np.full(len(landmarks), NO_GESTURE, np.uint8)
+    seen = hand_counts > 0
+    if seen.any():
+        counts, _ = count_fingers_batch(landmarks[seen, 0], palm_ratio, thumb_offset, handedness[seen, 0], thumb)
+        predicted[seen] = gestures_from_counts(counts)
+    return predicted
+
+
+def score_file(path, settings, chunk_size):
+    '''Confusion matrices (label x predicted) for each setting over one recording.'''
+    n = len(GESTURES)
+    matrices = np.zeros((len(settings), n, n), np.int64)
+
+    with LandmarkReader(path) as reader:
+        labels_path = path + ".labels.csv"
+        labels = load_labels(labels_path, len(reader)) if os.path.exists(labels_path) else None
+        if labels is None:
+            return path, matrices, 0
+
+        for start, landmarks, hand_counts in reader.chunks(chunk_size):
+            truth = labels[start:start + len(landmarks)]
+            handedness = np.asarray(reader.handedness[start:start + len(landmarks)])
+            keep = truth != UNLABELED
+            for i, (palm_ratio, thumb_offset, thumb) in enumerate(settings):
+                predicted = predict(landmarks[keep], hand_counts[keep], handedness[keep], palm_ratio, thumb_offset, thumb)
+                np.add.at(matrices[i], (truth[keep], predicted), 1)
+
+    return path, matrices, len(reader)
+
+
+def rescore(paths, settings, chunk_size=65536, workers=None):
+    '''Summed confusion matrices per setting over all recordings.'''
+    n = len(GESTURES)
+    totals = np.zeros((len(settings), n, n), np.int64)
+    frames = 0
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(score_file, path, settings, chunk_size) for path in paths]
+        for future in concurrent.futures.as_completed(futures):
+            path, matrices, count = future.result()
+            if not count:
+                print(f"{path}: no labels, skipped")
+            totals += matrices
+            frames += count
+    return totals, frames
+
+
+def report(settings, matrices):
+    results = []
+    for (palm_ratio, thumb_offset, thumb), matrix in zip(settings, matrices):
+        scored = matrix.sum()
+        accuracy = np.trace(matrix) / scored if scored else float("nan")
+        results.append({"palm_ratio": palm_ratio, "thumb_offset": thumb_offset, "thumb": thumb, "frames": int(scored),
+                        "accuracy": round(float(accuracy), 4), "confusion": matrix.tolist()})
+    return sorted(results, key=lambda r: -r["accuracy"] if r["frames"] else 0)
+
+
+def print_matrix(matrix):
+    width = max(map(len, GESTURES)) + 2
+    print(" " * width + "".join(f"{g:>{width}}" for g in GESTURES) + "   <- predicted")
+    for gesture, row in zip(GESTURES, matrix):
+        print(f"{gesture:>{width}}" + "".join(f"{v:>{width}}" for v in row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--palm-ratio", type=float, nargs="+", default=[0.5],
+                        help="finger open threshold as a fraction of palm height (default: 0.5)")
+    parser.add_argument("--thumb-offset", type=float, nargs="+", default=[6],
+                        help="thumb open threshold in percent of frame width (default: 6)")
+    parser.add_argument("--thumb", nargs="+", choices=THUMB_RULES, default=["palm"],
+                        help="thumb rule, see landmarks.THUMB_RULES (default: palm)")
+    parser.add_argument("--chunk", type=int, default=65536, help="frames per streamed chunk")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--out", help="write all results as JSON")
+    args = parser.parse_args(argv)
+
+    settings = list(itertools.product(args.palm_ratio, args.thumb_offset, args.thumb))
+    matrices, frames = rescore(args.recordings, settings, args.chunk, args.workers)
+    results = report(settings, matrices)
+
+    print(f"{frames} frames in {len(args.recordings)} recordings\n")
+    for r in results:
+        print(f"palm_ratio {r['palm_ratio']}  thumb_offset {r['thumb_offset']}  thumb {r['thumb']}  "
+              f"accuracy {r['accuracy']:.4f} over {r['frames']} labelled frames")
+    best = results[0]
+    print(f"\nbest: palm_ratio {best['palm_ratio']}, thumb_offset {best['thumb_offset']}, thumb {best['thumb']}")
+    print_matrix(np.array(best["confusion"]))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"recordings": args.recordings, "frames": frames, "gestures": GESTURES,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
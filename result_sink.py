@@ -0,0 +1,207 @@
+'''
+    Structured, rate-limited result output.
+
+    ResultSink takes raw results from the inference loop and writes them on
+    a background thread, so formatting and I/O never block capture or
+    inference. Results are turned into compact records by an encoder on the
+    writer thread, batched, and written by a backend:
+
+        JsonLinesBackend    one JSON object per line
+        BinaryBackend       fixed-layout little-endian records (see below)
+
+    submit() never blocks: when the writer falls behind, results are dropped
+    and counted. sample_every keeps every n-th result and max_rate caps the
+    accepted results per second. An error on the writer thread (encoding or
+    I/O) stops it and is raised from the next submit() and from close().
+'''
+
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+
+from landmarks import HANDEDNESS_CODES, UNKNOWN_HANDEDNESS, landmarks_to_array
+
+
+def _label(classifications):
+    return classifications[0].category_name if classifications else ""
+
+
+def encode_hands(results):
+    '''Record for a mp.solutions.hands result.'''
+    landmarks = results.multi_hand_landmarks or []
+    handedness = results.multi_handedness or []
+    return {
+        "hands": landmarks_to_array(landmarks).astype(float).round(5).tolist(),
+        "handedness": [h.classification[0].label for h in handedness],
+        "labels": [],
+    }
+
+
+def encode_gestures(result):
+    '''Record for a GestureRecognizerResult from the tasks API.'''
+    return {
+        "hands": [[[lm.x, lm.y, lm.z] for lm in hand] for hand in result.hand_landmarks],
+        "handedness": [_label(h) for h in result.handedness],
+        "labels": [_label(g) for g in result.gestures],
+    }
+
+
+class JsonLinesBackend:
+    def __init__(self, path="-"):
+        self.file = sys.stdout if path == "-" else open(path, "a", encoding="utf-8")
+
+    def write(self, records):
+        self.file.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class BinaryBackend:
+    '''Record layout, little-endian:
+
+        float64 timestamp, uint32 frame, uint8 hand count, then per hand:
+        uint8 handedness (0 left, 1 right, 255 unknown), 63 float32 landmarks,
+        uint8 label length, utf-8 label bytes
+    '''
+
+    RECORD = struct.Struct("<dIB")
+    HAND = struct.Struct("<B63f")
+
+    def __init__(self, path):
+        self.file = open(path, "ab")
+
+    def pack(self, record):
+        hands = record["hands"]
+        handedness = record["handedness"]
+        labels = record["labels"]
+
+        parts = [self.RECORD.pack(record["t"], record["frame"], len(hands))]
+        for i, hand in enumerate(hands):
+            code = HANDEDNESS_CODES.get(handedness[i] if i < len(handedness) else "", UNKNOWN_HANDEDNESS)
+            parts.append(self.HAND.pack(code, *(v for point in hand for v in point)))
+            label = (labels[i] if i < len(labels) else "").encode("utf-8")[:255]
+            parts.append(bytes([len(label)]) + label)
+        return b"".join(parts)
+
+    def write(self, records):
+        self.file.write(b"".join(self.pack(r) for r in records))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def open_backend(path):
+    '''"-" or *.jsonl for JSON lines, anything else binary.'''
+    if path == "-" or path.endswith((".jsonl", ".json")):
+        return JsonLinesBackend(path)
+    return BinaryBackend(path)
+
+
+class ResultSink:
+    def __init__(self, backend, encoder=encode_hands, batch_size=64, flush_interval=0.5,
+                 sample_every=1, max_rate=None, max_pending=1024):
+        self.backend = backend
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_every = max(1, sample_every)
+        self.min_interval = 1 / max_rate if max_rate else 0
+
+        self._pending = queue.Queue(max_pending)
+        self._frame = 0
+        self._last_accept = float("-inf")
+
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self._error = None
+
+        self._thread = threading.Thread(target=self._write, name="result-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, result, timestamp=None, frame=None):
+        '''Queue a result for writing, returns False when it was sampled out or dropped.'''
+        if self._error is not None:
+            raise self._error
+        if frame is None:
+            frame = self._frame
+        self._frame += 1
+
+        now = time.monotonic()
+        if frame % self.sample_every or now - self._last_accept < self.min_interval:
+            self.skipped += 1
+            return False
+
+        try:
+            self._pending.put_nowait((time.time() if timestamp is None else timestamp, frame, result))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self._last_accept = now
+        return True
+
+    # Lets the sink stand in for a queue as on_result
+    put = submit
+
+    def _write(self):
+        try:
+            self._write_batches()
+        except Exception as exc:
+            self._error = exc
+
+    def _write_batches(self):
+        batch = []
+        closing = False
+        while not closing:
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._pending.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                timestamp, frame, result = item
+                record = self.encoder(result)
+                record["t"] = timestamp
+                record["frame"] = frame
+                batch.append(record)
+
+            if batch:
+                self.backend.write(batch)
+                self.written += len(batch)
+                batch = []
+
+    def close(self):
+        if self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self.backend.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def add_sink_arguments(parser):
+    parser.add_argument("--log", default="-",
+                        help="result log: - for JSON lines on stdout, *.jsonl, or a binary file (default: -)")
+    parser.add_argument("--sample-every", type=int, default=1, help="log every n-th result only")
+    parser.add_argument("--max-rate", type=float, help="log at most this many results per second")
+
+
+def sink_from_args(args, encoder=encode_hands):
+    return ResultSink(open_backend(args.log), encoder,
+                      sample_every=args.sample_every, max_rate=args.max_rate)
@@ -0,0 +1,168 @@
+'''
+    Region-of-interest hand tracking.
+
+    Instead of handing the whole camera frame to hands.process every time,
+    ROITracker builds a square box around the previous frame's landmarks,
+    padded and shifted by the hand's last motion, and runs the model on
+    that crop downscaled to crop_size. Landmarks are mapped back to
+    full-frame normalized coordinates.
+
+    The crop goes to a second Hands instance (crop_hands), so neither
+    model's video-mode tracking state ever mixes crops with full frames.
+    Every frame costs exactly one inference. When the crop loses a hand,
+    or the landmark box jumps or changes size more than a tracked hand can
+    between frames, or landmarks touch the crop border (the hand is leaving
+    the box), that frame keeps what the crop found and the next frame
+    searches the full frame. While fewer than max_hands hands are tracked,
+    the full frame is also searched every redetect_every frames, so a hand
+    entering the view is picked up.
+'''
+
+import cv2
+import numpy as np
+
+from landmarks import LandmarkResult, landmarks_to_array
+
+# Side in pixels of the square crop the crop model sees
+CROP_SIZE = 256
+
+
+class TrackedResult(LandmarkResult):
+    '''Landmarks in full-frame coordinates, and whether the full frame was searched.'''
+
+    def __init__(self, landmarks, multi_handedness, full_frame):
+        super().__init__(landmarks, multi_handedness)
+        self.full_frame = full_frame
+
+
+class ROITracker:
+    # Smallest crop side in pixels, so a tiny or collapsed box still covers a hand
+    MIN_SIDE = 64
+
+    def __init__(self, hands, crop_hands, crop_size=CROP_SIZE, padding=0.35, max_scale_change=0.5, edge_margin=0.02,
+                 max_hands=2, redetect_every=15):
+        '''`hands` runs on full frames, `crop_hands` (a separate Hands, closed
+        by close()) on the crops.'''
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self.crop_size = crop_size
+        self.padding = padding
+        self.max_scale_change = max_scale_change
+        self.edge_margin = edge_margin
+        self.max_hands = max_hands
+        self.redetect_every = redetect_every
+
+        self._crop = np.empty((crop_size, crop_size, 3), np.uint8)
+        self._buffer = np.empty((max_hands, 21, 3), np.float32)
+
+        self._center = None
+        self._velocity = np.zeros(2)
+        self._side = 0.0
+        self._tracked = 0
+        self._since_full = 0
+        self._redetect = False
+
+        self.full_frames = 0
+        self.tracked_frames = 0
+
+    def reset(self):
+        self._center = None
+        self._velocity[:] = 0
+        self._tracked = 0
+
+    def close(self):
+        self.crop_hands.close()
+
+    def _box(self, width, height):
+        '''Predicted crop box (x0, y0, x1, y1) in pixels, kept inside the frame.'''
+        center = self._center + self._velocity
+        side = min(max(self._side * (1 + 2 * self.padding), self.MIN_SIDE), width, height)
+        x0 = int(np.clip(center[0] - side / 2, 0, width - side))
+        y0 = int(np.clip(center[1] - side / 2, 0, height - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
+
+    def _detect(self, hands, rgb):
+        res = hands.process(rgb)
+        if not res.multi_hand_landmarks:
+            return None, None
+        return landmarks_to_array(res.multi_hand_landmarks, self._buffer).copy(), res.multi_handedness
+
+    def _extent(self, landmarks, width, height):
+        '''Centre and side in pixels of the box around all landmarks.'''
+        xy = landmarks[..., :2].reshape(-1, 2) * (width, height)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        return (lo + hi) / 2, float((hi - lo).max())
+
+    def _stable(self, crop_landmarks, landmarks, width, height):
+        '''Whether the crop result can seed the next crop.'''
+        # A hand was lost, or is leaving the box
+        if len(landmarks) < self._tracked:
+            return False
+        xy = crop_landmarks[..., :2]
+        if not ((xy > self.edge_margin) & (xy < 1 - self.edge_margin)).all():
+            return False
+
+        # A real hand moves and scales smoothly; a jump means the crop latched onto something else
+        center, side = self._extent(landmarks, width, height)
+        if self._side and not 1 / (1 + self.max_scale_change) <= side / self._side <= 1 + self.max_scale_change:
+            return False
+        predicted = self._center + self._velocity
+        return bool(np.hypot(*(center - predicted)) <= self.max_scale_change * max(self._side, self.MIN_SIDE))
+
+    def _update(self, landmarks, width, height):
+        center, side = self._extent(landmarks, width, height)
+        if self._center is not None:
+            self._velocity = center - self._center
+        self._center = center
+        self._side = side
+        self._tracked = len(landmarks)
+
+    def _full_frame_due(self):
+        if self._center is None or self._redetect:
+            return True
+        # Look for hands that entered the view since the last full-frame search
+        return self._tracked < self.max_hands and self._since_full >= self.redetect_every
+
+    def __call__(self, rgb):
+        height, width = rgb.shape[:2]
+
+        if not self._full_frame_due():
+            x0, y0, x1, y1 = self._box(width, height)
+            cv2.resize(rgb[y0:y1, x0:x1], (self.crop_size, self.crop_size), dst=self._crop,
+                       interpolation=cv2.INTER_AREA)
+            landmarks, handedness = self._detect(self.crop_hands, self._crop)
+            self.tracked_frames += 1
+            self._since_full += 1
+
+            if landmarks is None:
+                # The hand left the box: search the full frame from the next frame on
+                self.reset()
+                return TrackedResult(np.empty((0, 21, 3), np.float32), None, full_frame=False)
+
+            # Crop-normalized -> full-frame normalized; z shares the x scale
+            crop_landmarks = landmarks.copy()
+            bw, bh = x1 - x0, y1 - y0
+            landmarks[..., 0] = (x0 + landmarks[..., 0] * bw) / width
+            landmarks[..., 1] = (y0 + landmarks[..., 1] * bh) / height
+            landmarks[..., 2] *= bw / width
+
+            if self._stable(crop_landmarks, landmarks, width, height):
+                self._update(landmarks, width, height)
+            else:
+                # Keep this frame's landmarks, but do not trust them to place the next crop
+                self._redetect = True
+            return TrackedResult(landmarks, handedness, full_frame=False)
+
+        # Lost, never had, or re-checking for hands: detect on the whole frame
+        self.full_frames += 1
+        self._since_full = 0
+        self._redetect = False
+        landmarks, handedness = self._detect(self.hands, rgb)
+        if landmarks is None:
+            self.reset()
+            return TrackedResult(np.empty((0, 21, 3), np.float32), None, full_frame=True)
+
+        self._velocity[:] = 0
+        self._center = None
+        self._update(landmarks, width, height)
+        return TrackedResult(landmarks, handedness, full_frame=True)
@@ -0,0 +1,96 @@
+'''
+    Adaptive frame skipping around the inference call.
+
+    AdaptiveScheduler keeps an exponential moving average of how long the
+    wrapped detect call takes. When that exceeds the per-frame budget (a
+    latency budget in seconds, or 1 / target_fps) it only runs inference on
+    every n-th frame, n = ceil(average / budget), up to max_stride. On the
+    frames in between it returns landmarks so count_fingers and drawing
+    still get data for every frame:
+
+        "hold"         repeat the last inferred landmarks
+        "extrapolate"  continue the motion between the last two inferences
+
+    Interpolating between two inferred frames would need to wait for the
+    later one and add a frame of latency, so it is not offered.
+'''
+
+import math
+import time
+
+import numpy as np
+
+from landmarks import LandmarkResult, result_landmarks
+
+MODES = ("hold", "extrapolate")
+
+
+class ScheduledResult(LandmarkResult):
+    '''A frame's landmarks and whether they came from inference on that frame.'''
+
+    def __init__(self, landmarks, multi_handedness, inferred):
+        super().__init__(landmarks, multi_handedness)
+        self.inferred = inferred
+
+
+class AdaptiveScheduler:
+    def __init__(self, detect, budget=None, target_fps=None, mode="extrapolate", alpha=0.2, max_stride=6):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        if budget is None and target_fps is None:
+            raise ValueError("give a latency budget or a target_fps")
+
+        self.detect = detect
+        self.budget = budget if budget is not None else 1 / target_fps
+        self.mode = mode
+        self.alpha = alpha
+        self.max_stride = max_stride
+
+        self.average = None
+        self.stride = 1
+
+        self._since = 0
+        self._last = None
+        self._previous = None
+        self._gap = 1
+        self._handedness = None
+
+        self.inferred = 0
+        self.skipped = 0
+
+    def _infer(self, rgb):
+        start = time.perf_counter()
+        res = self.detect(rgb)
+        elapsed = time.perf_counter() - start
+
+        self.average = elapsed if self.average is None else self.average + self.alpha * (elapsed - self.average)
+        self.stride = max(1, min(self.max_stride, math.ceil(self.average / self.budget)))
+
+        landmarks = np.array(result_landmarks(res), np.float32)
+        self._previous, self._last = self._last, landmarks
+        self._gap = max(1, self._since)
+        self._since = 1
+        self._handedness = res.multi_handedness
+        self.inferred += 1
+        return ScheduledResult(landmarks, res.multi_handedness, inferred=True)
+
+    def _fill(self):
+        last, previous = self._last, self._previous
+        if self.mode == "extrapolate" and previous is not None and previous.shape == last.shape:
+            landmarks = last + (last - previous) * (self._since / self._gap)
+        else:
+            landmarks = last
+
+        self._since += 1
+        self.skipped += 1
+        return ScheduledResult(landmarks, self._handedness, inferred=False)
+
+    def __call__(self, rgb):
+        if self._last is None or self._since >= self.stride:
+            return self._infer(rgb)
+        return self._fill()
+
+
+def add_scheduler_arguments(parser):
+    parser.add_argument("--target-fps", type=float,
+                        help="skip inference on some frames when it cannot keep up with this rate")
@@ -0,0 +1,160 @@
+'''
+    Landmark smoothing filters.
+
+    Both filters run on the whole (hands, 21, 3) landmark array at once, keep
+    their state in preallocated arrays, and are driven by frame timestamps
+    in seconds. Call the filter with each frame's landmarks; it returns the
+    smoothed array (reused on the next call). State is reset whenever the
+    number of hands changes, because hands are not matched across frames
+    (hand_tracking.HandTracker runs one filter per tracked hand instead).
+
+        OneEuroFilter    adaptive low-pass (Casiez et al., CHI 2012): smooth
+                         when the hand is still, little lag when it moves
+        KalmanFilter     constant-velocity Kalman filter per coordinate
+'''
+
+import abc
+import math
+
+import numpy as np
+
+FILTERS = ("one-euro", "kalman")
+
+
+class _LandmarkFilter(abc.ABC):
+    def __init__(self):
+        self._t = None
+        self._shape = None
+
+    def reset(self):
+        self._t = None
+
+    @abc.abstractmethod
+    def _allocate(self, shape):
+        '''Allocate the state arrays for landmarks of this shape.'''
+
+    @abc.abstractmethod
+    def _start(self, landmarks):
+        '''Start from these landmarks, without smoothing.'''
+
+    @abc.abstractmethod
+    def _step(self, landmarks, dt):
+        '''Smooth into self.out, dt seconds after the previous frame.'''
+
+    def __call__(self, landmarks, timestamp):
+        landmarks = np.asarray(landmarks, np.float32)
+        if landmarks.shape != self._shape:
+            self._shape = landmarks.shape
+            self._allocate(landmarks.shape)
+            self._t = None
+
+        if self._t is None or timestamp <= self._t:
+            self._t = timestamp
+            self._start(landmarks)
+        else:
+            dt = timestamp - self._t
+            self._t = timestamp
+            self._step(landmarks, dt)
+        return self.out
+
+
+class OneEuroFilter(_LandmarkFilter):
+    def __init__(self, min_cutoff=1.0, beta=30.0, d_cutoff=1.0):
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def _allocate(self, shape):
+        self.out = np.empty(shape, np.float32)
+        self._dx = np.empty(shape, np.float32)
+        self._tmp = np.empty(shape, np.float32)
+        self._alpha = np.empty(shape, np.float32)
+
+    def _start(self, landmarks):
+        self.out[...] = landmarks
+        self._dx.fill(0)
+
+    def _step(self, x, dt):
+        out, dx, tmp, alpha = self.out, self._dx, self._tmp, self._alpha
+
+        # Smoothed speed of every coordinate
+        np.subtract(x, out, out=tmp)
+        tmp /= dt
+        a_d = 1 / (1 + 1 / (2 * math.pi * self.d_cutoff * dt))
+        tmp -= dx
+        tmp *= a_d
+        dx += tmp
+
+        # Faster coordinates get a higher cutoff, i.e. less smoothing
+        np.abs(dx, out=alpha)
+        alpha *= self.beta
+        alpha += self.min_cutoff
+        alpha *= 2 * math.pi * dt
+        np.divide(alpha, alpha + 1, out=alpha)
+
+        np.subtract(x, out, out=tmp)
+        tmp *= alpha
+        out += tmp
+
+
+class KalmanFilter(_LandmarkFilter):
+    '''Constant-velocity model per coordinate.
+
+    process_noise is the acceleration noise density, measurement_noise the
+    variance of a landmark measurement (normalized units squared; the
+    default is a 0.005 standard deviation).
+    '''
+
+    def __init__(self, process_noise=1.0, measurement_noise=2.5e-5):
+        super().__init__()
+        self.q = process_noise
+        self.r = measurement_noise
+
+    def _allocate(self, shape):
+        self.out = np.empty(shape, np.float32)
+        self._v = np.empty(shape, np.float32)
+        self._p00 = np.empty(shape, np.float32)
+        self._p01 = np.empty(shape, np.float32)
+        self._p11 = np.empty(shape, np.float32)
+        self._k0 = np.empty(shape, np.float32)
+        self._k1 = np.empty(shape, np.float32)
+        self._y = np.empty(shape, np.float32)
+
+    def _start(self, landmarks):
+        self.out[...] = landmarks
+        self._v.fill(0)
+        self._p00.fill(self.r)
+        self._p01.fill(0)
+        self._p11.fill(1.0)
+
+    def _step(self, z, dt):
+        p, v = self.out, self._v
+        p00, p01, p11 = self._p00, self._p01, self._p11
+        k0, k1, y = self._k0, self._k1, self._y
+        q = self.q
+
+        # Predict
+        p += v * dt
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+
+        # Update
+        np.add(p00, self.r, out=k1)
+        np.divide(p00, k1, out=k0)
+        np.divide(p01, k1, out=k1)
+        np.subtract(z, p, out=y)
+        p += k0 * y
+        v += k1 * y
+        p11 -= k1 * p01
+        p01 *= 1 - k0
+        p00 *= 1 - k0
+
+
+def make_filter(name):
+    if name == "one-euro":
+        return OneEuroFilter()
+    if name == "kalman":
+        return KalmanFilter()
+    raise ValueError(f"filter must be one of {FILTERS}, got {name!r}")
@@ -0,0 +1,215 @@
+'''
+    Frame sources for the capture loop.
+
+    open_source() turns a source spec into an object with the
+    cv2.VideoCapture read()/isOpened()/get()/release() interface:
+
+        0, "1"            camera device index
+        clip.mp4          video file
+        frames/           directory of images, read in sorted filename order
+        dump.npy          (frames, height, width, 3) uint8 array, memory-mapped
+
+    An image that cannot be decoded is logged and skipped.
+
+    Files are replayed either as fast as possible (the default, for
+    benchmarks) or, with realtime=True, paced at their native fps as if they
+    were a live camera.
+
+    After read(), last_timestamp is the frame's time in seconds: the media
+    time for recorded sources, so replays are deterministic however fast
+    they run, and time.monotonic() at capture for cameras.
+'''
+
+import abc
+import logging
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+
+DEFAULT_FPS = 30.0
+
+log = logging.getLogger(__name__)
+
+
+class FileSource(abc.ABC):
+    '''Base for recorded sources: frame pacing and the common get() properties.'''
+
+    def __init__(self, frame_count, fps=None, realtime=False):
+        self.frame_count = frame_count
+        self.fps = fps or DEFAULT_FPS
+        self.realtime = realtime
+        # Paced replay stands in for a camera, so consumers should treat it as live
+        self.live = realtime
+        self.position = 0
+        self.last_timestamp = None
+        # (width, height), where it is known without decoding a frame
+        self.frame_size = None
+        self._opened = True
+        self._start = None
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        if self._start is None:
+            self._start = time.perf_counter()
+        delay = self._start + self.position / self.fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    @abc.abstractmethod
+    def _frame(self, index):
+        '''The frame at `index`, or None when there is none.'''
+
+    def read(self):
+        if not self._opened or self.position >= self.frame_count:
+            return False, None
+
+        self._pace()
+        frame = self._frame(self.position)
+        self.last_timestamp = self.position / self.fps
+        self.position += 1
+        return frame is not None, frame
+
+    def isOpened(self):
+        return self._opened
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.position * 1000.0 / self.fps
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT) and self.frame_size:
+            return float(self.frame_size[prop == cv2.CAP_PROP_FRAME_HEIGHT])
+        return 0.0
+
+    def release(self):
+        self._opened = False
+
+
+class VideoFileSource(FileSource):
+    def __init__(self, path, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                         self.cap.get(cv2.CAP_PROP_FPS), realtime)
+        self._opened = self.cap.isOpened()
+
+    def read(self):
+        if not self._opened:
+            return False, None
+
+        # The container frame count is only an estimate, decode until read() fails
+        self._pace()
+        frame = self._frame(self.position)
+        if frame is not None:
+            self.last_timestamp = self.position / self.fps
+            self.position += 1
+        return frame is not None, frame
+
+    def _frame(self, index):
+        # Decoding is sequential, read() only ever asks for the next frame
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirSource(FileSource):
+    def __init__(self, path, fps=None, realtime=False):
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        super().__init__(len(self.paths), fps, realtime)
+
+    def _frame(self, index):
+        frame = cv2.imread(self.paths[index])
+        # A file that does not decode is dropped, the next one takes its place
+        while frame is None:
+            log.warning("skipping unreadable image %s", self.paths[index])
+            del self.paths[index]
+            self.frame_count -= 1
+            if index >= self.frame_count:
+                return None
+            frame = cv2.imread(self.paths[index])
+        return frame
+
+
+class ArraySource(FileSource):
+    '''Frames from a (frames, height, width, 3) uint8 array or .npy dump.'''
+
+    def __init__(self, frames, fps=None, realtime=False):
+        if isinstance(frames, str):
+            frames = np.load(frames, mmap_mode="r")
+        if frames.ndim != 4 or frames.shape[-1] != 3:
+            raise ValueError(f"expected (frames, height, width, 3) array, got shape {frames.shape}")
+        self.frames = frames
+        super().__init__(len(frames), fps, realtime)
+        self.frame_size = (frames.shape[2], frames.shape[1])
+
+    def _frame(self, index):
+        # Copy out of the memmap so callers may draw on the frame
+        return np.array(self.frames[index])
+
+
+class CameraSource:
+    '''cv2.VideoCapture on a device index, flagged as live.'''
+
+    live = True
+
+    def __init__(self, index):
+        self.cap = cv2.VideoCapture(index)
+        self.last_timestamp = None
+
+    def read(self):
+        ret, frame = self.cap.read()
+        self.last_timestamp = time.monotonic()
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+def open_source(spec, realtime=False, fps=None):
+    '''Open a camera index, video file, image directory or .npy frame dump.'''
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if isinstance(spec, np.ndarray):
+        return ArraySource(spec, fps, realtime)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps, realtime)
+    if spec.lower().endswith(".npy"):
+        return ArraySource(spec, fps, realtime)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(f"No such source: {spec}")
+    return VideoFileSource(spec, realtime)
+
+
+def capture_policy(source):
+    '''Drop stale frames from live sources, keep every frame of a fast replay.'''
+    return "latest" if getattr(source, "live", True) else "block"
+
+
+def add_source_arguments(parser):
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or .npy frame dump (default: camera 0)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay recorded sources at their native fps instead of as fast as possible")
+    parser.add_argument("--capture-process", action="store_true",
+                        help="read the source in a separate process, handing frames over through shared memory")
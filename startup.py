@@ -0,0 +1,169 @@
+'''
+    Startup helpers for the entry points.
+
+    Opening a camera blocks in the driver (with the GIL released) for a good
+    part of a second, while importing mediapipe and building the hand graph is
+    CPU work. start_in_parallel() overlaps the two, so cold start costs the
+    longer of them rather than their sum.
+
+    The first hands.process() call also pays for graph initialization and
+    buffer allocation; warm_up() spends that on synthetic frames before the
+    first live one. warmer() runs it as soon as the capture is open, at the
+    resolution the capture reports (capture_size), so the buffers it
+    allocates are the ones the live frames use.
+'''
+
+import concurrent.futures
+import sys
+import time
+
+import numpy as np
+
+# Usual webcam default
+WARMUP_SIZE = (640, 480)
+
+
+class StartupTimer:
+    '''Seconds from creation to each named milestone, e.g. "capture", "model".'''
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.origin
+        return self.marks[name]
+
+    def report(self):
+        return " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.marks.items())
+
+
+def start_in_parallel(open_capture, load_model, timer=None, warm=None):
+    '''Run open_capture() on a helper thread while load_model() runs here,
+    then warm(model, capture) once both are ready.
+
+    Returns (capture, model). A capture that finished opening is released
+    again if loading the model or warming it up fails, and the model (or
+    each model of a tuple) is closed when opening the capture or warm-up
+    fails.
+    '''
+    def opened():
+        capture = open_capture()
+        if timer is not None:
+            timer.mark("capture")
+        return capture
+
+    with concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="capture-open") as pool:
+        capture_future = pool.submit(opened)
+        try:
+            model = load_model()
+        except BaseException:
+            capture_future.add_done_callback(lambda f: f.exception() is None and f.result().release())
+            raise
+        if timer is not None:
+            timer.mark("model")
+        try:
+            capture = capture_future.result()
+        except BaseException:
+            close_models(model)
+            raise
+
+    if warm is not None:
+        try:
+            warm(model, capture)
+        except BaseException:
+            capture.release()
+            close_models(model)
+            raise
+        if timer is not None:
+            timer.mark("warmup")
+    return capture, model
+
+
+def close_models(model):
+    '''Close a model, or every model of a tuple, skipping those without close().'''
+    for m in model if isinstance(model, tuple) else (model,):
+        if hasattr(m, "close"):
+            m.close()
+
+
+def load_hands(max_hands=2, **options):
+    '''A mediapipe Hands model; options are passed on to Hands().'''
+    # mediapipe is imported here, not at module top, so it can load while the camera opens
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(max_num_hands=max_hands, **options)
+
+
+def with_crop_model(load_hands, roi):
+    '''load_model for start_in_parallel returning (hands, crop_hands): with
+    roi, crop_hands is a second model for roi.ROITracker, else None.'''
+    def load():
+        hands = load_hands()
+        if not roi:
+            return hands, None
+        try:
+            return hands, load_hands()
+        except BaseException:
+            hands.close()
+            raise
+    return load
+
+
+def warm_up(process, size=WARMUP_SIZE, frames=3):
+    '''Run `process` (e.g. hands.process) on `frames` synthetic RGB frames of
+    size (width, height) so the first live frame runs at steady-state
+    latency. Returns the seconds it took.'''
+    width, height = size
+    # Noise rather than black, so the detector does its full work
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), np.uint8)
+    frame.flags.writeable = False
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        process(frame)
+    return time.perf_counter() - start
+
+
+def capture_size(cap, default=WARMUP_SIZE):
+    '''(width, height) of the frames `cap` delivers, `default` where it does not report it.'''
+    import cv2
+
+    get = getattr(cap, "get", None)
+    if get is None:
+        return default
+    width, height = int(get(cv2.CAP_PROP_FRAME_WIDTH)), int(get(cv2.CAP_PROP_FRAME_HEIGHT))
+    return (width, height) if width > 0 and height > 0 else default
+
+
+def warmer(args):
+    '''warm(hands, capture) for start_in_parallel, as configured by
+    add_warmup_arguments: at --warmup-size, or else the capture's own
+    resolution. `hands` may also be the (hands, crop_hands) pair of
+    with_crop_model, the crop model is warmed up at the crop size. The
+    duration goes to stderr, stdout may carry results.'''
+    def warm(hands, capture):
+        if not args.warmup_frames:
+            return
+        hands, crop_hands = hands if isinstance(hands, tuple) else (hands, None)
+        models = [(hands, args.warmup_size or capture_size(capture))]
+        if crop_hands is not None:
+            from roi import CROP_SIZE
+            models.append((crop_hands, (CROP_SIZE, CROP_SIZE)))
+
+        for model, size in models:
+            seconds = warm_up(model.process, size, args.warmup_frames)
+            print(f"warm-up: {args.warmup_frames} frames at {size[0]}x{size[1]} in {seconds * 1000:.0f} ms",
+                  file=sys.stderr)
+    return warm
+
+
+def parse_size(value):
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def add_warmup_arguments(parser):
+    parser.add_argument("--warmup-frames", type=int, default=3,
+                        help="synthetic frames to run through the hand model before the first live one (0 to skip)")
+    parser.add_argument("--warmup-size", type=parse_size, metavar="WxH",
+                        help="resolution of the warm-up frames (default: the capture's, else 640x480)")
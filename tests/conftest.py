@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# The scripts are flat top-level modules, not a package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from capture import ThreadedCapture
+from sources import ArraySource
+
+
+class FailingSource(ArraySource):
+    '''Delivers `good` frames, then read() raises.'''
+
+    def __init__(self, good):
+        super().__init__(np.zeros((10, 8, 8, 3), np.uint8))
+        self.good = good
+
+    def read(self):
+        if self.position >= self.good:
+            raise OSError("device unplugged")
+        return super().read()
+
+
+def test_replays_every_frame():
+    frames = np.arange(20, dtype=np.uint8)[:, None, None, None] * np.ones((1, 8, 8, 3), np.uint8)
+    cap = ThreadedCapture(ArraySource(frames))
+    received = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        received.append(int(frame[0, 0, 0]))
+    cap.release()
+
+    assert received == list(range(20))
+    assert not cap.isOpened()
+
+
+def test_source_error_is_raised_after_buffered_frames():
+    cap = ThreadedCapture(FailingSource(good=3), policy="block")
+    frames = [cap.read(timeout=5)[0] for _ in range(3)]
+
+    with pytest.raises(OSError, match="unplugged"):
+        cap.read(timeout=5)
+    assert frames == [True] * 3
+    assert not cap.isOpened()
+    cap.release()
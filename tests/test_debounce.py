@@ -0,0 +1,56 @@
+import pytest
+
+from debounce import GestureDebouncer
+
+FPS = 30
+
+
+def feed(debounce, value, start, seconds):
+    '''Feed `value` at FPS from `start` for `seconds`, returns the commit times.'''
+    commits = []
+    for i in range(int(seconds * FPS)):
+        timestamp = start + i / FPS
+        if debounce.update(value, timestamp) is not None:
+            commits.append(timestamp)
+    return commits
+
+
+def test_commits_after_hold():
+    debounce = GestureDebouncer(hold=0.5)
+    assert feed(debounce, 5, 0.0, 1.0) == [pytest.approx(0.5)]
+    assert debounce.committed == 5
+
+
+def test_flicker_does_not_restart_hold():
+    debounce = GestureDebouncer(hold=0.5)
+    values = [5] * 20
+    values[7] = 3
+    commits = debounce.run(values, [i / FPS for i in range(len(values))])
+    assert commits == [(pytest.approx(15 / FPS), 5)]
+
+
+def test_single_frame_after_gap_does_not_commit():
+    debounce = GestureDebouncer(hold=0.5)
+    feed(debounce, 5, 0.0, 1.0)
+    assert debounce.update(3, 1.0 + 2.0) is None
+    assert debounce.committed == 5
+
+
+def test_value_after_gap_commits_once_held_again():
+    debounce = GestureDebouncer(hold=0.5)
+    feed(debounce, 5, 0.0, 1.0)
+    commits = feed(debounce, 3, 3.0, 1.0)
+    assert commits == [pytest.approx(3.5)]
+    assert debounce.committed == 3
+
+
+def test_timestamps_must_not_go_backwards():
+    debounce = GestureDebouncer()
+    debounce.update(1, 1.0)
+    with pytest.raises(ValueError):
+        debounce.update(1, 0.5)
+
+
+def test_window_shorter_than_hold_is_rejected():
+    with pytest.raises(ValueError):
+        GestureDebouncer(hold=0.5, window=0.2)
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+
+from frame_ring import FrameRing, RingCapture
+
+
+def test_recorded_source_delivers_every_frame(tmp_path):
+    frames = np.arange(40, dtype=np.uint8)[:, None, None, None] * np.ones((1, 8, 8, 3), np.uint8)
+    path = str(tmp_path / "clip.npy")
+    np.save(path, frames)
+
+    cap = RingCapture(path, slots=3)
+    try:
+        received = []
+        while True:
+            ret, frame = cap.read(timeout=5)
+            if not ret:
+                break
+            received.append(int(frame[0, 0, 0]))
+            # A slow consumer must not lose frames of a recording
+            time.sleep(0.002)
+    finally:
+        cap.release()
+
+    assert received == list(range(40))
+    assert cap.dropped == 0
+
+
+def test_non_blocking_ring_drops_oldest():
+    ring = FrameRing((2, 2, 3), slots=3)
+    try:
+        for i in range(5):
+            ring.write(np.full((2, 2, 3), i, np.uint8))
+        ret, frame = ring.read(timeout=0)
+        assert ret and frame[0, 0, 0] == 4
+        assert ring.dropped == 4
+    finally:
+        ring.close()
+
+
+def test_source_that_fails_to_open_ends_stream(tmp_path):
+    cap = RingCapture(str(tmp_path / "missing.npy"), shape=(8, 8, 3))
+    try:
+        start = time.monotonic()
+        assert cap.read() == (False, None)
+        assert time.monotonic() - start < 5
+        assert not cap.isOpened()
+    finally:
+        cap.release()
+
+
+def test_dead_capture_process_ends_stream(tmp_path):
+    path = str(tmp_path / "clip.npy")
+    np.save(path, np.zeros((40, 8, 8, 3), np.uint8))
+
+    cap = RingCapture(path, slots=3)
+    try:
+        # The blocking writer fills the ring and waits, then dies there
+        assert cap.read(timeout=5)[0]
+        time.sleep(0.2)
+        cap._process.kill()
+        cap._process.join()
+
+        frames = 0
+        while cap.read()[0]:
+            frames += 1
+        assert frames < 40
+        assert not cap.isOpened()
+    finally:
+        cap.release()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from gesture_events import GestureEvents
+from landmarks import LandmarkResult
+
+
+class FakeCapture:
+    def __init__(self, frames, gate=None):
+        self.frames = frames
+        self.gate = gate
+        self.read_count = 0
+        self.log = []
+
+    def read(self):
+        if self.gate is not None:
+            self.gate.wait()
+        self.log.append("read")
+        if self.read_count >= self.frames:
+            return False, None
+        self.read_count += 1
+        self.last_timestamp = self.read_count / 30
+        return True, np.zeros((48, 64, 3), np.uint8)
+
+    def release(self):
+        self.log.append("release")
+
+
+def no_hands(rgb):
+    return LandmarkResult(np.empty((0, 21, 3), np.float32), [])
+
+
+def test_late_subscriber_sees_first_frame():
+    async def main():
+        events = GestureEvents(FakeCapture(5), no_hands)
+        runner = asyncio.ensure_future(events.run())
+        await asyncio.sleep(0.05)
+        assert not runner.done()
+
+        frames = [result.timestamp async for result in events.frames(maxsize=10)]
+        await runner
+        return frames
+
+    assert asyncio.run(main()) == [1 / 30, 2 / 30, 3 / 30, 4 / 30, 5 / 30]
+
+
+def test_cancel_releases_after_inflight_read():
+    gate = threading.Event()
+    cap = FakeCapture(5, gate)
+
+    async def main():
+        events = GestureEvents(cap, no_hands)
+        events.frames()
+        runner = asyncio.ensure_future(events.run())
+        await asyncio.sleep(0.05)
+        runner.cancel()
+        await asyncio.sleep(0.05)
+        # Still blocked in read(): the capture must not be released yet
+        assert cap.log == []
+        gate.set()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert cap.log == ["read", "release"]
@@ -0,0 +1,89 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from gesture_session import GestureSession
+
+
+class FakeRecognizer:
+    '''Records recognize_async calls, results are delivered by the test.'''
+
+    def __init__(self, options):
+        self.options = options
+        self.timestamps = []
+        self.closed = False
+
+    def recognize_async(self, image, timestamp_ms):
+        self.timestamps.append(timestamp_ms)
+
+    def close(self):
+        self.closed = True
+
+    def deliver(self, timestamp_ms):
+        self.options.result_callback("result", None, timestamp_ms)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    vision = types.SimpleNamespace(
+        GestureRecognizerOptions=types.SimpleNamespace,
+        RunningMode=types.SimpleNamespace(LIVE_STREAM="live_stream"),
+        GestureRecognizer=types.SimpleNamespace(create_from_options=FakeRecognizer))
+    mp = types.SimpleNamespace(
+        Image=lambda image_format, data: data, ImageFormat=types.SimpleNamespace(SRGB="srgb"),
+        tasks=types.SimpleNamespace(BaseOptions=types.SimpleNamespace, vision=vision))
+    monkeypatch.setitem(sys.modules, "mediapipe", mp)
+
+    results = []
+    session = GestureSession("gesture_recognizer.task", lambda result, image, ts: results.append(ts))
+    session.results = results
+    yield session
+    session.close()
+
+
+def frame():
+    return np.zeros((8, 8, 3), np.uint8)
+
+
+def test_skipped_results_count_as_dropped(session):
+    recognizer = session._recognizer
+    submissions = [session.recognize(frame(), i / 30) for i in range(5)]
+    timestamps = [s.timestamp_ms for s in submissions]
+    assert recognizer.timestamps == timestamps
+
+    # Results for frames 1 and 4 only: 0, 2 and 3 were dropped by the graph
+    recognizer.deliver(timestamps[1])
+    recognizer.deliver(timestamps[4])
+
+    assert session.results == [timestamps[1], timestamps[4]]
+    assert [s.dropped for s in submissions] == [True, False, True, True, False]
+    assert submissions[1].latency is not None and submissions[0].latency is None
+    stats = session.stats()
+    assert (stats["submitted"], stats["completed"], stats["dropped"], stats["in_flight"]) == (5, 2, 3, 0)
+    assert session.lookup(timestamps[2]) is submissions[2]
+
+
+def test_close_counts_pending_as_dropped(session):
+    recognizer = session._recognizer
+    submissions = [session.recognize(frame(), i / 30) for i in range(4)]
+    recognizer.deliver(submissions[0].timestamp_ms)
+    assert session.in_flight == 3
+
+    session.close()
+
+    assert recognizer.closed
+    assert [s.dropped for s in submissions] == [False, True, True, True]
+    assert (session.dropped, session.in_flight) == (3, 0)
+    with pytest.raises(RuntimeError):
+        session.recognize(frame())
+
+
+def test_timestamps_strictly_increase_on_repeated_source_times(session):
+    source_times = [10.0, 10.0, 10.0, 10.0005, 10.1, 10.1, 10.05]
+    timestamps = [session.next_timestamp(t) for t in source_times]
+
+    assert timestamps[0] == 0
+    assert all(b > a for a, b in zip(timestamps, timestamps[1:]))
+    assert timestamps[4] == 100
@@ -0,0 +1,82 @@
+import sys
+import types
+
+import numpy as np
+
+from finger_count import RoundResult, play
+from hand_tracking import HandTracker
+from sources import ArraySource
+
+
+def hand_at(x, y):
+    '''A closed hand with every landmark on its palm centre.'''
+    hand = np.zeros((21, 3), np.float32)
+    hand[:, :2] = x, y
+    return hand
+
+
+def test_two_hands_keep_their_ids():
+    tracker = HandTracker()
+    first = tracker.update([hand_at(0.3, 0.5), hand_at(0.7, 0.5)], ["Right", "Left"], 0.0)
+    ids = {state.handedness: state.track for state in first}
+    assert len(set(ids.values())) == 2
+
+    # Both hands move a little and the detector reports them in the other order
+    for i in range(1, 10):
+        dx = 0.01 * i
+        states = tracker.update([hand_at(0.7 - dx, 0.5), hand_at(0.3 + dx, 0.5)], ["Left", "Right"], i / 30)
+        assert [state.track for state in states] == [ids["Left"], ids["Right"]]
+
+
+def test_dropped_track_gets_a_new_id_after_max_age():
+    tracker = HandTracker(max_age=0.5)
+    (state,) = tracker.update([hand_at(0.5, 0.5)], ["Right"], 0.0)
+
+    # Back within max_age: same track
+    tracker.update([], [], 0.2)
+    (returned,) = tracker.update([hand_at(0.5, 0.5)], ["Right"], 0.4)
+    assert returned.track == state.track
+
+    # Gone for longer than max_age: a new track
+    tracker.update([], [], 1.0)
+    assert tracker.tracks == []
+    (returned,) = tracker.update([hand_at(0.5, 0.5)], ["Right"], 1.1)
+    assert returned.track != state.track
+
+
+class StubHands:
+    '''Stands in for mediapipe's Hands: one right fist in every frame.'''
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+
+    def process(self, image):
+        self.calls += 1
+        points = [types.SimpleNamespace(x=0.5, y=0.5, z=0.0) for _ in range(21)]
+        label = types.SimpleNamespace(classification=[types.SimpleNamespace(label="Right", score=0.9)])
+        return types.SimpleNamespace(multi_hand_landmarks=[types.SimpleNamespace(landmark=points)],
+                                     multi_handedness=[label])
+
+    def close(self):
+        self.closed = True
+
+
+def test_play_headless_smoke(monkeypatch):
+    # play() only needs the drawing and hands namespaces of mediapipe.solutions
+    solutions = types.SimpleNamespace(drawing_utils=None, hands=types.SimpleNamespace(HAND_CONNECTIONS=()))
+    monkeypatch.setitem(sys.modules, "mediapipe", types.SimpleNamespace(solutions=solutions))
+
+    hands = StubHands()
+    cap = ArraySource(np.zeros((30, 48, 64, 3), np.uint8), fps=30)
+    results = []
+    play(cap, headless=True, on_result=results.append, hand_obj=hands)
+
+    assert hands.calls == 30
+    assert hands.closed and not cap.isOpened()
+    # The fist is committed once, after holding for `hold` seconds
+    assert len(results) == 1
+    result = results[0]
+    assert isinstance(result, RoundResult)
+    assert (result.player, result.handedness) == ("rock", "Right")
+    assert result.winner == ("Player" if result.bot == "scissors" else "Bot")
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from landmarks import INDEX_MCP, MIDDLE_MCP, PINKY_MCP, THUMB_TIP, WRIST, count_fingers_batch
+
+
+def original_count_fingers(hand):
+    '''The scalar count_fingers the scripts started with, on one (21, 3) hand.'''
+    x = [float(v) for v in hand[:, 0]]
+    y = [float(v) for v in hand[:, 1]]
+    cnt = 0
+    thresh = (y[0] * 100 - y[9] * 100) / 2
+    for base, tip in ((5, 8), (9, 12), (13, 16), (17, 20)):
+        if (y[base] * 100 - y[tip] * 100) > thresh:
+            cnt += 1
+    if (x[5] * 100 - x[4] * 100) > 6:
+        cnt += 1
+    return cnt
+
+
+def open_right_hand():
+    '''A right hand, palm to the camera on the mirrored frame: thumb to the left, all fingers up.'''
+    hand = np.zeros((21, 3), np.float32)
+    hand[:, 0] = 0.5
+    hand[WRIST, :2] = 0.5, 0.8
+    hand[MIDDLE_MCP, :2] = 0.5, 0.6
+    for base, x in zip((5, 9, 13, 17), (0.44, 0.5, 0.54, 0.58)):
+        hand[base, :2] = x, 0.6
+        hand[base + 1:base + 4, 0] = x
+        hand[base + 1:base + 4, 1] = 0.5, 0.45, 0.4
+    hand[1:4, :2] = [[0.46, 0.75], [0.42, 0.7], [0.38, 0.65]]
+    hand[THUMB_TIP, :2] = 0.34, 0.62
+    return hand
+
+
+def mirrored(hand):
+    hand = hand.copy()
+    hand[:, 0] = 1 - hand[:, 0]
+    return hand
+
+
+def test_right_hand_counts_five_under_both_rules():
+    hands = open_right_hand()[None]
+    for rule in ("palm", "fixed"):
+        counts, _ = count_fingers_batch(hands, handedness=["Right"], thumb=rule)
+        assert counts.tolist() == [5]
+
+
+def test_mirrored_left_hand_thumb_follows_palm():
+    hands = mirrored(open_right_hand())[None]
+
+    counts, states = count_fingers_batch(hands, handedness=["Left"], thumb="palm")
+    assert counts.tolist() == [5] and states[0, 0]
+
+    counts, states = count_fingers_batch(hands, handedness=["Left"], thumb="fixed")
+    assert counts.tolist() == [4] and not states[0, 0]
+
+
+@pytest.mark.parametrize("label, thumb_open", [("Left", True), ("Right", False), (None, False)])
+def test_edge_on_palm_falls_back_to_handedness(label, thumb_open):
+    hand = mirrored(open_right_hand())
+    # Knuckles in line with the camera: no usable pinky to index direction
+    hand[INDEX_MCP, :2] = hand[PINKY_MCP, :2] = 0.5, 0.6
+    hand[THUMB_TIP, :2] = 0.6, 0.62
+
+    _, states = count_fingers_batch(hand[None], handedness=[label])
+    assert states[0, 0] == thumb_open
+
+
+def test_fixed_rule_matches_original_count_fingers():
+    hands = np.random.default_rng(0).random((20000, 21, 3), dtype=np.float32)
+    counts, _ = count_fingers_batch(hands, thumb="fixed")
+    expected = [original_count_fingers(hand) for hand in hands]
+    assert counts.tolist() == expected
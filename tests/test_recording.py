@@ -0,0 +1,37 @@
+import numpy as np
+
+from recording import LandmarkReader, LandmarkRecorder
+
+
+def record(path, frames=5):
+    with LandmarkRecorder(str(path), max_hands=2) as recorder:
+        for i in range(frames):
+            hands = np.full((i % 3, 21, 3), i, np.float32)
+            recorder.write_array(hands, 0.1 * i, ["Left", "Right"][:len(hands)], [0.9] * len(hands))
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.hlmk"
+    record(path)
+
+    with LandmarkReader(str(path)) as reader:
+        assert len(reader) == 5
+        assert reader.complete
+        assert reader.hand_counts.tolist() == [0, 1, 2, 0, 1]
+        np.testing.assert_allclose(reader.timestamps, [0.0, 0.1, 0.2, 0.3, 0.4])
+        assert reader.hands(2).shape == (2, 21, 3)
+        assert (reader.hands(2) == 2).all()
+
+    assert reader.landmarks is None
+
+
+def test_close_with_views_outstanding(tmp_path):
+    path = tmp_path / "session.hlmk"
+    record(path)
+
+    reader = LandmarkReader(str(path))
+    hands = reader.hands(4)
+    reader.close()
+
+    # The map stays alive for arrays still referring to it
+    assert (hands == 4).all()
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from result_sink import ResultSink
+
+
+class ListBackend:
+    def __init__(self):
+        self.records = []
+        self.closed = False
+
+    def write(self, records):
+        self.records.extend(records)
+
+    def close(self):
+        self.closed = True
+
+
+def test_writes_every_result():
+    backend = ListBackend()
+    with ResultSink(backend, encoder=lambda result: {"value": result}, flush_interval=0.01) as sink:
+        for i in range(10):
+            assert sink.submit(i, timestamp=i)
+
+    assert [r["value"] for r in backend.records] == list(range(10))
+    assert [r["frame"] for r in backend.records] == list(range(10))
+    assert backend.closed
+
+
+def test_writer_error_is_raised():
+    def encoder(result):
+        if result == 3:
+            raise TypeError("not serializable")
+        return {"value": result}
+
+    backend = ListBackend()
+    sink = ResultSink(backend, encoder=encoder, flush_interval=0.01)
+    for i in range(4):
+        sink.submit(i)
+    time.sleep(0.1)
+
+    with pytest.raises(TypeError, match="not serializable"):
+        sink.submit(4)
+    with pytest.raises(TypeError, match="not serializable"):
+        sink.close()
+    assert backend.closed
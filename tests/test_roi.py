@@ -0,0 +1,67 @@
+import types
+
+import cv2
+import numpy as np
+
+from roi import ROITracker
+
+WIDTH, HEIGHT = 640, 480
+
+
+class BlobHands:
+    '''Stand-in for mp.solutions.hands.Hands: every bright blob is a hand,
+    with its 21 landmarks spread over the blob's bounding box.'''
+
+    def __init__(self):
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        h, w = rgb.shape[:2]
+        n, _, stats, _ = cv2.connectedComponentsWithStats((rgb[..., 0] > 128).astype(np.uint8))
+        hands, handedness = [], []
+        for x, y, bw, bh, area in stats[1:n]:
+            xs = np.linspace(x, x + bw - 1, 21) / w
+            ys = np.linspace(y, y + bh - 1, 21) / h
+            hands.append(types.SimpleNamespace(
+                landmark=[types.SimpleNamespace(x=a, y=b, z=0.0) for a, b in zip(xs, ys)]))
+            handedness.append(types.SimpleNamespace(
+                classification=[types.SimpleNamespace(label="Right", score=0.5)]))
+        return types.SimpleNamespace(multi_hand_landmarks=hands or None, multi_handedness=handedness or None)
+
+    def close(self):
+        pass
+
+
+def frame(*boxes):
+    image = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    for x, y in boxes:
+        image[y:y + 60, x:x + 50] = 255
+    return image
+
+
+def test_one_inference_per_frame_and_redetect():
+    hands, crop_hands = BlobHands(), BlobHands()
+    tracker = ROITracker(hands, crop_hands, max_hands=2, redetect_every=10)
+
+    found = []
+    for i in range(40):
+        boxes = [(100 + 3 * i, 200)] + ([(450, 100)] if i >= 12 else [])
+        result = tracker(frame(*boxes))
+        assert hands.calls + crop_hands.calls == i + 1
+        found.append(len(result.landmarks))
+
+    # The second hand is picked up by the periodic full-frame search
+    assert found[:12] == [1] * 12
+    assert found[-10:] == [2] * 10
+    assert hands.calls == 3
+
+
+def test_lost_hand_falls_back_to_full_frame():
+    hands, crop_hands = BlobHands(), BlobHands()
+    tracker = ROITracker(hands, crop_hands, max_hands=1)
+
+    results = [tracker(frame() if i in (3, 4) else frame((100, 200))) for i in range(8)]
+
+    assert [len(r.landmarks) for r in results] == [1, 1, 1, 0, 0, 1, 1, 1]
+    assert [r.full_frame for r in results] == [True, False, False, False, True, True, False, False]
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from smoothing import KalmanFilter, OneEuroFilter, _LandmarkFilter
+
+
+def test_base_filter_is_abstract():
+    with pytest.raises(TypeError):
+        _LandmarkFilter()
+
+
+@pytest.mark.parametrize("make", [OneEuroFilter, KalmanFilter])
+def test_still_hand_stays_put(make):
+    smoother = make()
+    hands = np.full((1, 21, 3), 0.5, np.float32)
+    for i in range(30):
+        out = smoother(hands, i / 30)
+    np.testing.assert_allclose(out, hands, atol=1e-4)
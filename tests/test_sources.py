@@ -0,0 +1,32 @@
+import logging
+
+import cv2
+import numpy as np
+import pytest
+
+from sources import FileSource, ImageDirSource
+
+
+def test_image_dir_skips_unreadable_files(tmp_path, caplog):
+    for i in range(4):
+        cv2.imwrite(str(tmp_path / f"{i}.png"), np.full((8, 8, 3), i * 10, np.uint8))
+    (tmp_path / "1.png").write_bytes(b"not an image")
+    (tmp_path / "3.png").write_bytes(b"not an image")
+
+    source = ImageDirSource(str(tmp_path))
+    with caplog.at_level(logging.WARNING, logger="sources"):
+        frames = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(int(frame[0, 0, 0]))
+
+    assert frames == [0, 20]
+    assert source.frame_count == 2
+    assert sum("unreadable" in r.message for r in caplog.records) == 2
+
+
+def test_file_source_is_abstract():
+    with pytest.raises(TypeError):
+        FileSource(0)
@@ -0,0 +1,94 @@
+import argparse
+
+import cv2
+import numpy as np
+import pytest
+
+from roi import CROP_SIZE
+from sources import ArraySource
+from startup import WARMUP_SIZE, capture_size, start_in_parallel, warmer, with_crop_model
+
+
+class Resource:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    release = close
+
+
+def test_model_closed_when_capture_fails():
+    model = Resource()
+
+    def open_capture():
+        raise OSError("no camera")
+
+    with pytest.raises(OSError):
+        start_in_parallel(open_capture, lambda: model)
+    assert model.closed
+
+
+def test_capture_released_when_model_fails():
+    capture = Resource()
+
+    def load_model():
+        raise RuntimeError("no model")
+
+    with pytest.raises(RuntimeError):
+        start_in_parallel(lambda: capture, load_model)
+    assert capture.closed
+
+
+class SizedCapture(Resource):
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: 1280.0, cv2.CAP_PROP_FRAME_HEIGHT: 720.0}.get(prop, 0.0)
+
+
+def test_warm_up_at_capture_resolution():
+    sizes = []
+
+    class Hands(Resource):
+        def process(self, rgb):
+            sizes.append(rgb.shape)
+
+    args = argparse.Namespace(warmup_frames=2, warmup_size=None)
+    start_in_parallel(SizedCapture, Hands, warm=warmer(args))
+    assert sizes == [(720, 1280, 3)] * 2
+
+
+def test_capture_size_falls_back():
+    assert capture_size(Resource()) == WARMUP_SIZE
+    assert capture_size(ArraySource(np.zeros((2, 48, 64, 3), np.uint8))) == (64, 48)
+
+
+def test_crop_model_loaded_and_warmed_with_roi():
+    sizes = []
+
+    class Hands(Resource):
+        def process(self, rgb):
+            sizes.append(rgb.shape)
+
+    args = argparse.Namespace(warmup_frames=1, warmup_size=None)
+    _, (hands, crop_hands) = start_in_parallel(SizedCapture, with_crop_model(Hands, roi=True), warm=warmer(args))
+    assert isinstance(crop_hands, Hands) and crop_hands is not hands
+    assert sizes == [(720, 1280, 3), (CROP_SIZE, CROP_SIZE, 3)]
+
+    _, (hands, crop_hands) = start_in_parallel(SizedCapture, with_crop_model(Hands, roi=False))
+    assert crop_hands is None
+
+
+def test_both_models_closed_when_capture_fails():
+    models = []
+
+    def load():
+        models.append(Resource())
+        return models[-1]
+
+    def open_capture():
+        raise OSError("no camera")
+
+    with pytest.raises(OSError):
+        start_in_parallel(open_capture, with_crop_model(load, roi=True))
+    assert len(models) == 2 and all(m.closed for m in models)
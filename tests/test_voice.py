@@ -0,0 +1,126 @@
+import importlib.util
+import pathlib
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+# media lives in the bundled venv; only that package is loaded, not the rest of its site-packages
+MEDIA = pathlib.Path(__file__).resolve().parent.parent / "Lib" / "site-packages" / "media"
+
+
+def load_media():
+    if "media" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("media", MEDIA / "__init__.py",
+                                                      submodule_search_locations=[str(MEDIA)])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["media"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["media"]
+
+
+media = load_media()
+
+
+class FakeSynthesizer:
+    '''Returns "<voice>|<lang>|<text>" as audio and records every synthesis.'''
+
+    def __init__(self, calls, voice_name, lang, path=None, memory=False):
+        self.calls = calls
+        self.voice_name = voice_name
+        self.lang = lang
+
+    def speak_text_async(self, text):
+        self.calls.append((self.voice_name, self.lang, text))
+        audio = f"{self.voice_name}|{self.lang}|{text}".encode()
+        result = types.SimpleNamespace(reason="SynthesizingAudioCompleted", audio_data=audio,
+                                       cancellation_details=None)
+        return types.SimpleNamespace(get=lambda: result)
+
+    speak_ssml_async = speak_text_async
+
+
+@pytest.fixture
+def voice(tmp_path):
+    calls, played = [], []
+    voice = media.Voice("key", "region", cache=media.AudioCache(str(tmp_path)), player=played.append,
+                        synthesizer=lambda *args, **kwargs: FakeSynthesizer(calls, *args, **kwargs))
+    voice.calls, voice.played = calls, played
+    yield voice
+    voice.close()
+
+
+def test_miss_synthesizes_then_hit_replays(voice):
+    assert voice.speak("three", voice_name="en-US-AriaNeural", lang="en-US")
+    assert voice.speak("three", voice_name="en-US-AriaNeural", lang="en-US")
+
+    assert voice.calls == [("en-US-AriaNeural", "en-US", "three")]
+    assert voice.played == [b"en-US-AriaNeural|en-US|three"] * 2
+    assert (voice.cache.misses, voice.cache.hits) == (1, 1)
+
+
+def test_voice_or_language_change_is_a_new_entry(voice):
+    voice.speak("three", voice_name="en-US-AriaNeural", lang="en-US")
+    voice.speak("three", voice_name="en-GB-RyanNeural", lang="en-US")
+    voice.speak("three", voice_name="en-GB-RyanNeural", lang="en-GB")
+
+    assert voice.calls == [("en-US-AriaNeural", "en-US", "three"),
+                           ("en-GB-RyanNeural", "en-US", "three"),
+                           ("en-GB-RyanNeural", "en-GB", "three")]
+    assert len(voice.cache) == 3
+
+
+def test_save_uses_cache(voice, tmp_path):
+    path = tmp_path / "three.wav"
+    voice.speak("three", voice_name="en-US-AriaNeural", lang="en-US")
+    assert voice.save("three", path=str(path))
+
+    assert len(voice.calls) == 1
+    assert path.read_bytes() == b"en-US-AriaNeural|en-US|three"
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = media.AudioCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+
+    assert "b" not in cache
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size == 8
+    assert not (tmp_path / ("b" + cache.SUFFIX)).exists()
+
+
+def test_cache_reloads_from_disk(tmp_path):
+    media.AudioCache(str(tmp_path)).put("a", b"aaaa")
+    assert media.AudioCache(str(tmp_path)).get("a") == b"aaaa"
+
+
+def test_voice_change_waits_for_async_synthesis():
+    calls, seen = [], []
+    started = threading.Event()
+
+    class SlowSynthesizer(FakeSynthesizer):
+        def speak_text_async(self, text):
+            started.set()
+            time.sleep(0.05)
+            # The voice must not change under a running synthesis
+            seen.append(voice.name)
+            return super().speak_text_async(text)
+
+    voice = media.Voice("key", "region", player=lambda audio: None,
+                        synthesizer=lambda *args, **kwargs: SlowSynthesizer(calls, *args, **kwargs))
+    try:
+        future = voice.speak_async("three", voice_name="en-US-AriaNeural")
+        assert started.wait(timeout=5)
+        assert voice.speak("four", voice_name="en-GB-RyanNeural")
+        assert future.result(timeout=5)
+    finally:
+        voice.close()
+
+    assert seen == ["en-US-AriaNeural", "en-GB-RyanNeural"]
+    assert calls == [("en-US-AriaNeural", None, "three"), ("en-GB-RyanNeural", None, "four")]